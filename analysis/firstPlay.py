@@ -8,7 +8,7 @@ Created on Tue Oct 22 21:13:17 2019
 import sys
 sys.path.append('../src')
 
-from Game import Game
+from Runner import runRealisations
 from Players import Sticker, BasicStrategist, Counter
 from matplotlib import pyplot as plt
 import numpy as np
@@ -36,45 +36,29 @@ if __name__ == '__main__':
     # Each of the players we are going to use
     playerClasses = [BasicStrategist, Counter]
 
-    # A list (later a numpy array) of the histories of each player
+    # Play all realisations in parallel. playerHistory has
     # shape = (Nplayers, Nrealisations, Nrounds)
-    playerHistory = np.zeros((len(playerClasses), Nrealisations, Nshoes*52*6//len(playerClasses)))
+    startTime = time()
+    playerHistory, historyLengths = runRealisations(playerClasses, Nshoes, Nrealisations,
+                                                    startingBank=startingBank)
+    print(f"{Nrealisations} games took {time() - startTime}")
 
     # The mean of each players bank at this round
-    playersMeans = np.zeros((len(playerClasses), Nshoes*52*6//2))
-
+    playersMeans = np.zeros((len(playerClasses), playerHistory.shape[2]))
 
     # All players will have the same number of rounds played by the end of each
     # experiment/realisation, however the different realisations may have a
     # different number of rounds between them,. which causes problems when
     # averaging over the realisations. Only average as far as is possible using
     # all realisations
-    minRounds = np.inf
-    maxRounds = 0
+    minRounds = historyLengths.min()
 
     for realisation in range(Nrealisations):
-        # Lets create the players
-        players = [player(startingBank) for player in playerClasses]
-
-        # Create the game and add the players
-        game = Game()
-        for i, player in enumerate(players):
-            game.addPlayerToSeat(player, i+1)
-
-        # Play the game
-        startTime = time()
-        game.play(numberOfShoes=Nshoes, showHands=False, showBanks=False)
-        print(f"Game {realisation+1}/{Nrealisations} took {time() - startTime}")
-        # Set the minimum/maximum number of rounds played so far
-        thisRounds = len(players[0].bankHistory)
-        minRounds = min(minRounds, thisRounds)
-        maxRounds = max(maxRounds, thisRounds)
-
-        # Store the history of each player's bank for this round
-        for i, player in enumerate(players):
-            playerHistory[i, realisation, :thisRounds] = np.asarray(player.bankHistory)
-            
-            plt.plot(player.bankHistory, color=colours[i], alpha=Nrealisations**-0.7)
+        thisRounds = historyLengths[realisation]
+
+        # Plot the history of each player's bank for this round
+        for i in range(len(playerClasses)):
+            plt.plot(playerHistory[i, realisation, :thisRounds], color=colours[i], alpha=Nrealisations**-0.7)
 
             # Plot where the player busts
             if np.min(playerHistory[i, realisation, :thisRounds]) < 1e-5:
@@ -85,7 +69,7 @@ if __name__ == '__main__':
     for i, history in enumerate(playerHistory):
         playersMeans[i, :minRounds] = history[:, :minRounds].mean(axis=0)
     for i, mean in enumerate(playersMeans):
-        plt.plot(mean[:minRounds], color=colours[i], linestyle='--', label=players[i].__name__)
+        plt.plot(mean[:minRounds], color=colours[i], linestyle='--', label=playerClasses[i].__name__)
 
     plt.ylabel(r'$Bank$')
     plt.xlabel(r'$Round$')
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the engine's hot paths.
+
+Measures rounds/sec for Table.nextRound, shoes/sec for Game.play with 1-6
+seated players of each type in Players.py, and micro-benchmarks of the
+functions called every card or every hand. Results are written as JSON and
+can be compared against a stored baseline, e.g.
+
+    python engineBenchmarks.py --save-baseline baseline.json
+    python engineBenchmarks.py --baseline baseline.json --output results.json
+
+The comparison exits with status 1 if any benchmark is slower than the
+baseline by more than the tolerance.
+"""
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../src'))
+
+import argparse
+import json
+import platform
+from time import perf_counter
+
+from Game import Game
+from Table import Table
+from Broadcast import Broadcast
+from DeckAndShoe import Shoe
+from PolicyTable import handOf
+from ExpectedValues import ExpectedValues
+import Players
+import utilityFunctions as ut
+
+# Player types to seat, and how many shoes each plays per measurement
+PLAYER_TYPES = {
+    'Mug': 20,
+    'Sticker': 20,
+    'Risker': 20,
+    'BasicStrategist': 20,
+    'Counter': 20,
+    'Oracle': 2,
+}
+
+
+def bestRate(function, count, repeats):
+    """
+    Run function repeats times and return the best rate.
+
+    Parameters
+    ----------
+    function : callable
+        Does count operations each time it is called
+    count : int
+        Number of operations per call
+    repeats : int
+        Number of calls
+
+    Returns
+    -------
+    rate : float
+        Operations per second of the fastest call
+    """
+    best = float('inf')
+    for repeat in range(repeats):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return count / best
+
+
+def makePlayer(name):
+    if name == 'Oracle':
+        return Players.Oracle(10**9, expectedValues=ExpectedValues(exact=False))
+    return getattr(Players, name)(10**9)
+
+
+def benchNextRound(scale, repeats):
+    """
+    Rounds/sec of Table.nextRound with six basic strategists.
+    """
+    rounds = 2000 * scale
+    game = Game(seed=1)
+    for seatNo in range(6):
+        game.addPlayerToSeat(Players.BasicStrategist(10**9), seatNo)
+    table = game.table
+
+    def run():
+        for r in range(rounds):
+            if table.shoe.cutCardReached():
+                table.newShoe()
+            table.nextRound()
+    return bestRate(run, rounds, repeats)
+
+
+def benchGamePlay(name, numberOfPlayers, scale, repeats):
+    """
+    Shoes/sec of Game.play with numberOfPlayers players of one type.
+    """
+    numberOfShoes = PLAYER_TYPES[name] * scale
+    game = Game(seed=1)
+    for seatNo in range(numberOfPlayers):
+        game.addPlayerToSeat(makePlayer(name), seatNo)
+    return bestRate(lambda: game.play(numberOfShoes=numberOfShoes), numberOfShoes, repeats)
+
+
+def benchNextCard(scale, repeats):
+    """
+    Cards/sec dealt by Shoe.nextCard.
+    """
+    shoes = 100 * scale
+    shoe = Shoe(Broadcast())
+    numberOfCards = len(shoe.cards)
+
+    def run():
+        for s in range(shoes):
+            shoe.position = 0
+            for c in range(numberOfCards):
+                shoe.nextCard()
+    return bestRate(run, shoes * numberOfCards, repeats)
+
+
+def benchPenetrate(scale, repeats):
+    """
+    Calls/sec of Shoe.penetrate.
+    """
+    calls = 100000 * scale
+    shoe = Shoe(Broadcast())
+
+    def run():
+        for c in range(calls):
+            shoe.penetrate(250)
+    return bestRate(run, calls, repeats)
+
+
+def benchNewShoe(scale, repeats):
+    """
+    Shoes/sec made by Table.newShoe.
+    """
+    shoes = 500 * scale
+    table = Table(Broadcast())
+
+    def run():
+        for s in range(shoes):
+            table.newShoe()
+    return bestRate(run, shoes, repeats)
+
+
+def benchGetTotal(scale, repeats):
+    """
+    Calls/sec of utilityFunctions.getTotal on a three card hand.
+    """
+    calls = 100000 * scale
+    hand = handOf(11, 5, 10)
+
+    def run():
+        for c in range(calls):
+            ut.getTotal(hand)
+    return bestRate(run, calls, repeats)
+
+
+def benchBroadcastAppend(scale, repeats):
+    """
+    Cards/sec through Broadcast.append.
+    """
+    shoes = 100 * scale
+    broadcast = Broadcast()
+    cards = Shoe(broadcast).cards
+
+    def run():
+        for s in range(shoes):
+            broadcast.reset()
+            for card in cards:
+                broadcast.append(card)
+    return bestRate(run, shoes * len(cards), repeats)
+
+
+def runBenchmarks(scale=1, repeats=3):
+    """
+    Run every benchmark.
+
+    Parameters
+    ----------
+    scale : int
+        Multiplies the amount of work in each measurement
+    repeats : int
+        Measurements per benchmark, the best is kept
+
+    Returns
+    -------
+    results : dict
+        Benchmark name to {'value': rate, 'unit': unit}
+    """
+    results = {}
+
+    def add(name, value, unit):
+        results[name] = {'value': value, 'unit': unit}
+        print('{:40s} {:14.1f} {}'.format(name, value, unit))
+
+    add('Table.nextRound', benchNextRound(scale, repeats), 'rounds/s')
+    for name in PLAYER_TYPES:
+        for numberOfPlayers in range(1, 7):
+            add('Game.play[{}x{}]'.format(name, numberOfPlayers),
+                benchGamePlay(name, numberOfPlayers, scale, repeats), 'shoes/s')
+    add('Shoe.nextCard', benchNextCard(scale, repeats), 'cards/s')
+    add('Shoe.penetrate', benchPenetrate(scale, repeats), 'calls/s')
+    add('Table.newShoe', benchNewShoe(scale, repeats), 'shoes/s')
+    add('utilityFunctions.getTotal', benchGetTotal(scale, repeats), 'calls/s')
+    add('Broadcast.append', benchBroadcastAppend(scale, repeats), 'cards/s')
+    return results
+
+
+def compareToBaseline(results, baseline, tolerance):
+    """
+    Compare results with a baseline. Every benchmark is a rate, so lower
+    is slower.
+
+    Parameters
+    ----------
+    results : dict
+        Current results
+    baseline : dict
+        Baseline results
+    tolerance : float
+        Fractional slowdown allowed before a benchmark counts as a regression
+
+    Returns
+    -------
+    regressions : list of str
+        Names of the benchmarks that regressed
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['value'] / baseline[name]['value']
+        flag = ''
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('{:40s} {:6.2f}x baseline{}'.format(name, ratio, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against this JSON file')
+    parser.add_argument('--save-baseline', help='write results as a new baseline to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed fractional slowdown (default 0.1)')
+    parser.add_argument('--scale', type=int, default=1, help='work per measurement')
+    parser.add_argument('--repeats', type=int, default=3, help='measurements per benchmark')
+    args = parser.parse_args()
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'benchmarks': runBenchmarks(args.scale, args.repeats),
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compareToBaseline(report['benchmarks'], baseline['benchmarks'], args.tolerance)
+        if regressions:
+            print('{} benchmark(s) regressed'.format(len(regressions)))
+            sys.exit(1)
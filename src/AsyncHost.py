@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio host for many tables and remote bot players.
+
+An AsyncHost plays any number of games on one event loop. Rounds are
+played exactly as Table.nextRound plays them, except that every question
+put to a player is awaited, so while one table waits on a slow player the
+others carry on. Ordinary in-process players are asked directly. A player
+that provides <method>Async versions of its methods, such as RemotePlayer,
+is awaited instead.
+
+RemotePlayer is a bot in another process (or on another machine) speaking
+a JSON lines protocol over TCP. Every question is one line,
+
+    {"id": 7, "type": "wantsToHit", "bank": 79920.0, "bet": 80.0,
+     "hand": [0, 37], "dealer": 10, "newShoe": false, "decks": 6,
+     "seen": [12, 40, 3]}
+
+where type is getBet, wantsToSplit, wantsToDoubleDown or wantsToHit, cards
+are integer encoded (see Cards.py), dealer is the value of the dealer's
+up-card and seen lists the cards dealt since the previous question (from
+the start of the shoe if newShoe, and always empty with an InfiniteShoe,
+whose cards are independent draws). The dealer's hole card is left out of
+seen until the dealer has played, and is sent with the next question after
+that. The bot replies with one line,
+
+    {"id": 7, "answer": true}
+
+A bot that does not answer within the timeout sits the round out (for
+getBet) or declines (for decisions). On connecting a bot sends
+{"name": ...}, and at the end the host sends {"type": "close"}.
+runClient connects any in-process player as a bot, e.g. over loopback for
+testing.
+"""
+
+import asyncio
+import json
+
+from Broadcast import Broadcast
+from Decisions import STAND, HIT, DOUBLE, SPLIT, ALLOW_HIT, ALLOW_DOUBLE, ALLOW_SPLIT
+from DeckAndShoe import Shoe
+from HandSeatAndDealer import Hand
+from Players import Player
+
+
+async def ask(player, method, *args):
+    """
+    Put a question to a player, awaiting the answer if the player has an
+    async version of the method.
+    """
+    asyncMethod = getattr(player, method + 'Async', None)
+    if asyncMethod is None:
+        return getattr(player, method)(*args)
+    return await asyncMethod(*args)
+
+
+async def getBets(table):
+    """
+    Table.getBets, awaiting each player's bet.
+    """
+    for seat in table.seats:
+        if seat.player:
+            seat.newBet(await ask(seat.player, 'getBet'))
+
+
+async def decide(player, hand, allowed):
+    """
+    Decisions.decide, awaiting the player's answers.
+    """
+    if allowed & ALLOW_SPLIT and await ask(player, 'wantsToSplit', hand):
+        return SPLIT
+    if allowed & ALLOW_DOUBLE and await ask(player, 'wantsToDoubleDown', hand):
+        return DOUBLE
+    if allowed & ALLOW_HIT and await ask(player, 'wantsToHit', hand):
+        return HIT
+    return STAND
+
+
+async def playerActions(table):
+    """
+    Table.playerActions, awaiting each player's decisions. The rules are
+    those of Table.actionRequests.
+    """
+    requests = table.actionRequests()
+    try:
+        seat, hand, allowed = next(requests)
+        while True:
+            action = await decide(seat.player, hand, allowed)
+            seat, hand, allowed = requests.send(action)
+    except StopIteration:
+        pass
+
+
+async def playRound(table):
+    """
+    Table.nextRound, awaiting the players. Remote players are not sent the
+    dealer's hole card until the dealer plays.
+    """
+    table.cleanSeats()
+    await getBets(table)
+    table.deal()
+    remotePlayers = [player for player in table.getPlayers() if isinstance(player, RemotePlayer)]
+    for player in remotePlayers:
+        # The hole card is the last card dealt
+        player.holePosition = table.shoe.position - 1
+    await playerActions(table)
+    for player in remotePlayers:
+        player.holePosition = None
+    table.dealerAction()
+    table.settleUp()
+
+
+async def playGame(game, numberOfShoes=1):
+    """
+    Game.play, awaiting the players and letting other tables play between
+    rounds. Rounds are played by the host, so no round hooks (profiler, logs
+    or RoundKernel) may be installed on the table.
+    """
+    table = game.table
+    if table.roundHooks:
+        raise ValueError('Cannot host a table with round hooks: ', table.roundHooks)
+    for n in range(numberOfShoes):
+        roundsPlayed = 0
+        while not table.shoe.finished(roundsPlayed):
+            await playRound(table)
+            roundsPlayed += 1
+            await asyncio.sleep(0)
+        table.newShoe()
+
+
+class RemotePlayer(Player):
+    """
+    A player whose decisions are made by a bot over a socket connection.
+
+    Parameters
+    ----------
+    name : str
+        Name the bot gave
+    reader, writer : asyncio streams
+        The bot's connection
+    bank : float
+        Starting bank
+    timeout : float
+        Seconds the bot has to answer each question
+    """
+
+    def __init__(self, name, reader, writer, bank=1000, timeout=1.):
+        super().__init__(bank)
+        self.__name__ = name
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.table = None
+        self.questions = 0
+        self.timeouts = 0
+        self.shoe = None
+        self.cardsSent = 0
+        # Position of the dealer's hole card while it is face down, and the
+        # hole card held back from the bot until the dealer plays
+        self.holePosition = None
+        self.heldBack = None
+
+    async def request(self, questionType, default, hand=None):
+        """
+        Ask the bot a question and wait for its answer.
+
+        Returns
+        -------
+        answer : object
+            The bot's answer, or default if it did not answer in time
+        """
+        shoe = self.table.shoe
+        newShoe = shoe is not self.shoe or shoe.position < self.cardsSent
+        if newShoe:
+            self.shoe = shoe
+            self.cardsSent = 0
+            self.heldBack = None
+        self.questions += 1
+        seen = []
+        if isinstance(shoe, Shoe):
+            seen = shoe.cards[self.cardsSent:shoe.position]
+            if self.holePosition is not None and self.cardsSent <= self.holePosition < shoe.position:
+                self.heldBack = seen.pop(self.holePosition - self.cardsSent)
+            elif self.holePosition is None and self.heldBack is not None:
+                seen.insert(0, self.heldBack)
+                self.heldBack = None
+        question = {'id': self.questions, 'type': questionType, 'bank': self.bank,
+                    'newShoe': newShoe, 'decks': shoe.numberOfDecks, 'seen': seen}
+        self.cardsSent = shoe.position
+        if hand is not None:
+            question.update({'hand': hand.cards, 'bet': hand.bet,
+                             'dealer': self.broadcast.dealersTotal})
+        self.writer.write((json.dumps(question) + '\n').encode())
+        await self.writer.drain()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            while True:
+                line = await asyncio.wait_for(self.reader.readline(), deadline - loop.time())
+                if not line:
+                    break
+                reply = json.loads(line)
+                # Late answers to earlier questions are dropped
+                if reply.get('id') == self.questions:
+                    return reply['answer']
+        except asyncio.TimeoutError:
+            pass
+        self.timeouts += 1
+        return default
+
+    async def getBetAsync(self):
+        return await self.request('getBet', 0)
+
+    async def wantsToSplitAsync(self, hand):
+        return bool(await self.request('wantsToSplit', False, hand))
+
+    async def wantsToDoubleDownAsync(self, hand):
+        return bool(await self.request('wantsToDoubleDown', False, hand))
+
+    async def wantsToHitAsync(self, hand):
+        return bool(await self.request('wantsToHit', False, hand))
+
+    async def close(self):
+        """
+        Tell the bot the game is over and close the connection.
+        """
+        self.writer.write(b'{"type": "close"}\n')
+        await self.writer.drain()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class AsyncHost(object):
+    """
+    Plays many games on one event loop, with in-process and remote players.
+    """
+
+    def __init__(self):
+        self.games = []
+        self.remotePlayers = []
+        self.server = None
+        self.port = None
+        self.arrivals = asyncio.Queue()
+
+    def addGame(self, game):
+        """
+        Add a game to be played. Returns the game.
+        """
+        self.games.append(game)
+        return game
+
+    def addPlayerToSeat(self, game, player, seatNo):
+        """
+        Seat a player (in-process or remote) in one of the host's games.
+        """
+        game.addPlayerToSeat(player, seatNo)
+        if isinstance(player, RemotePlayer):
+            player.table = game.table
+
+    async def listen(self, host='127.0.0.1', port=0):
+        """
+        Start accepting bot connections. The port is stored in self.port.
+        """
+        self.server = await asyncio.start_server(self.arrive, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def arrive(self, reader, writer):
+        hello = json.loads(await reader.readline())
+        await self.arrivals.put((hello['name'], reader, writer))
+
+    async def acceptPlayer(self, bank=1000, timeout=1.):
+        """
+        Wait for the next bot to connect.
+
+        Parameters
+        ----------
+        bank : float
+            Starting bank of the bot
+        timeout : float
+            Seconds the bot has to answer each question
+
+        Returns
+        -------
+        player : RemotePlayer
+            The bot, ready to be seated
+        """
+        name, reader, writer = await self.arrivals.get()
+        player = RemotePlayer(name, reader, writer, bank, timeout)
+        self.remotePlayers.append(player)
+        return player
+
+    async def play(self, numberOfShoes=1):
+        """
+        Play every game for a number of shoes, concurrently.
+        """
+        await asyncio.gather(*(playGame(game, numberOfShoes) for game in self.games))
+
+    async def close(self):
+        """
+        Disconnect the bots and stop listening.
+        """
+        for player in self.remotePlayers:
+            await player.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def runClient(player, host='127.0.0.1', port=None):
+    """
+    Connect an in-process player to a host as a bot, and answer its
+    questions until the host closes the game. The player keeps its own
+    broadcast from the cards it is sent.
+
+    Parameters
+    ----------
+    player : Player object
+        The player answering the questions
+    host : str
+        Host address
+    port : int
+        Host port
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps({'name': player.__name__}) + '\n').encode())
+    await writer.drain()
+
+    broadcast = Broadcast()
+    for name in player.countingSystems:
+        broadcast.registerCount(name)
+    player.broadcast = broadcast
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        question = json.loads(line)
+        if question['type'] == 'close':
+            break
+        if question['newShoe']:
+            broadcast.reset(question['decks'])
+        for card in question['seen']:
+            broadcast.append(card)
+        player.bank = question['bank']
+
+        if question['type'] == 'getBet':
+            answer = player.getBet()
+        else:
+            hand = Hand(question['bet'])
+            for card in question['hand']:
+                hand.addCard(card)
+            broadcast.dealersTotal = question['dealer']
+            answer = bool(getattr(player, question['type'])(hand))
+        writer.write((json.dumps({'id': question['id'], 'answer': answer}) + '\n').encode())
+        await writer.drain()
+
+    writer.close()
+    await writer.wait_closed()
+
+
+if __name__ == '__main__':
+
+    from time import time
+
+    from Game import Game
+    from Players import BasicStrategist, Counter
+
+    async def main():
+        host = AsyncHost()
+        await host.listen()
+
+        # Two bots over loopback, each at their own table
+        bots = [Counter(80000), Counter(80000)]
+        clients = [asyncio.ensure_future(runClient(bot, port=host.port)) for bot in bots]
+        remotes = []
+        for seed in range(len(bots)):
+            game = host.addGame(Game(seed=seed))
+            remote = await host.acceptPlayer(80000, timeout=1.)
+            host.addPlayerToSeat(game, remote, 0)
+            remotes.append(remote)
+
+        # And many in-process tables
+        for seed in range(len(bots), 200):
+            game = host.addGame(Game(seed=seed))
+            for seatNo in range(3):
+                host.addPlayerToSeat(game, BasicStrategist(80000), seatNo)
+
+        startTime = time()
+        await host.play(numberOfShoes=5)
+        print("{} tables played 5 shoes in {:.1f} s".format(len(host.games), time() - startTime))
+        for remote in remotes:
+            print("{}: bank = {}, questions = {}, timeouts = {}".format(
+                remote.__name__, remote.bank, remote.questions, remote.timeouts))
+        await host.close()
+        await asyncio.gather(*clients)
+
+    asyncio.run(main())
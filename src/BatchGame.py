@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorised batch engine.
+
+Plays many independent games of blackjack in lockstep, with every game's
+shoe, hands and banks held in NumPy arrays. Each game follows exactly the
+rules of Game.play (same deal order, splitting, doubling, dealer play and
+payouts), so for the same shoes it produces the same bank histories.
+
+Only table-driven players are supported: their playing decisions must be
+expressible as a PolicyTable, and their bets a function of the true Hi-Lo
+count through Player.getBets.
+"""
+
+import numpy as np
+
+from Cards import (CARD_VALUE, CARD_HARD_VALUE, CARD_IS_ACE,
+                   CARD_HILO)
+from DeckAndShoe import Deck
+from PolicyTable import PolicyTable, isTableDriven
+
+# Per-card lookups
+VALUE = np.array(CARD_VALUE, dtype=np.int64)
+HARD_VALUE = np.array(CARD_HARD_VALUE, dtype=np.int64)
+IS_ACE = np.array(CARD_IS_ACE, dtype=np.int64)
+HILO = np.array(CARD_HILO, dtype=np.int64)
+
+# Maximum number of hands at a seat, i.e. one split
+MAX_HANDS = 2
+
+
+class BatchHands(object):
+    """
+    The hands at one seat, or the dealer's hand, for every game.
+
+    Parameters
+    ----------
+    numberOfGames : int
+        Number of games being played in lockstep
+    """
+
+    def __init__(self, numberOfGames):
+        self.exists = np.zeros(numberOfGames, dtype=bool)
+        self.stuck = np.zeros(numberOfGames, dtype=bool)
+        self.hardTotal = np.zeros(numberOfGames, dtype=np.int64)
+        self.numberOfAces = np.zeros(numberOfGames, dtype=np.int64)
+        self.numberOfCards = np.zeros(numberOfGames, dtype=np.int64)
+        self.firstCard = np.zeros(numberOfGames, dtype=np.int64)
+        self.lastCard = np.zeros(numberOfGames, dtype=np.int64)
+        self.bet = np.zeros(numberOfGames)
+
+    def reset(self, exists, bet=0):
+        """
+        Start new, empty hands.
+
+        Parameters
+        ----------
+        exists : array of bool
+            Which games have a hand here
+        bet : array of float
+            Bet on each hand
+        """
+        self.exists[:] = exists
+        self.stuck[:] = False
+        self.hardTotal[:] = 0
+        self.numberOfAces[:] = 0
+        self.numberOfCards[:] = 0
+        self.bet[:] = bet
+
+    def addCards(self, games, cards):
+        """
+        Add one card to the hand in each of the given games.
+
+        Parameters
+        ----------
+        games : array of int
+            Indices of the games
+        cards : array of int
+            The card for each game
+        """
+        self.hardTotal[games] += HARD_VALUE[cards]
+        self.numberOfAces[games] += IS_ACE[cards]
+        self.firstCard[games] = np.where(self.numberOfCards[games] == 0,
+                                         cards, self.firstCard[games])
+        self.lastCard[games] = cards
+        self.numberOfCards[games] += 1
+
+    def removeLastCard(self, games):
+        """
+        Remove the second card of two card hands, e.g. when splitting.
+
+        Parameters
+        ----------
+        games : array of int
+            Indices of the games
+        """
+        cards = self.lastCard[games]
+        self.hardTotal[games] -= HARD_VALUE[cards]
+        self.numberOfAces[games] -= IS_ACE[cards]
+        self.lastCard[games] = self.firstCard[games]
+        self.numberOfCards[games] -= 1
+
+    def soft(self):
+        return (self.numberOfAces > 0) & (self.hardTotal <= 11)
+
+    def total(self):
+        return self.hardTotal + 10 * self.soft()
+
+
+class BatchGame(object):
+    """
+    Many independent games of blackjack played at once. Each game has its
+    own shoe and its own copy of each player's bank.
+
+    Parameters
+    ----------
+    numberOfGames : int
+        Number of games to play in lockstep
+    numberOfDecks : int
+        Number of decks in each shoe
+    penPosition : int
+        Position to penetrate each shoe
+    seed : int
+        Seed for shuffling the shoes
+    shoeSource : callable
+        Optional replacement for the shuffler. Called with a number of shoes,
+        returns an integer array of shape (number, 52*numberOfDecks) holding
+        the cards of each shoe in dealing order.
+    """
+
+    def __init__(self, numberOfGames, numberOfDecks=6, penPosition=250,
+                 seed=None, shoeSource=None):
+        self.numberOfGames = numberOfGames
+        self.numberOfDecks = numberOfDecks
+        self.penPosition = penPosition
+        self.rng = np.random.default_rng(seed)
+        self.shoeSource = shoeSource if shoeSource is not None else self.shuffledShoes
+        self.template = np.array(Deck().cards * numberOfDecks, dtype=np.int64)
+        self.seats = {}
+
+    def addPlayerToSeat(self, player, seatNo):
+        """
+        Add a player to a seat in every game. The player's current bank is
+        every game's starting bank; the player itself is not changed by play.
+        
+        Each seat keeps its own bank, so a player may only be seated once.
+        Raises ValueError for a player already seated, one that is not
+        table-driven or one that counts with anything but Hi-Lo.
+
+        Parameters
+        ----------
+        player : Player object
+            Table-driven player to add to the seat
+        seatNo : int
+            Seat number player wants to sit at (index from 0)
+        """
+        if any(seated is player for s, seated in self.seats.items() if s != seatNo):
+            raise ValueError('BatchGame cannot seat a player twice: ', player.__name__)
+        if not isTableDriven(player):
+            raise ValueError('BatchGame can only play table-driven players (see '
+                             'PolicyTable.isTableDriven), got: ', player.__name__)
+        if any(system != 'HiLo' for system in player.countingSystems):
+            raise ValueError('BatchGame only provides Hi-Lo counts, got: ', player.countingSystems)
+        self.seats[seatNo] = player
+
+    def shuffledShoes(self, number):
+        """
+        Shuffle some new shoes.
+
+        Parameters
+        ----------
+        number : int
+            How many shoes
+
+        Returns
+        -------
+        shoes : array of int
+            Shape (number, 52*numberOfDecks), cards in dealing order
+        """
+        return self.rng.permuted(np.tile(self.template, (number, 1)), axis=1)
+
+    def draw(self, games):
+        """
+        Deal the next card in each of the given games.
+
+        Parameters
+        ----------
+        games : array of int
+            Indices of the games
+
+        Returns
+        -------
+        cards : array of int
+            The card dealt in each game
+        """
+        cards = self.shoes[games, self.position[games]]
+        self.position[games] += 1
+        self.hiLoCount[games] += HILO[cards]
+        return cards
+
+    def hitUntilStuck(self, hands, hitTable, upCards):
+        """
+        Play hands normally, hitting until the player sticks, busts or reaches
+        21. Hands are played in lockstep, one card per game per pass.
+        """
+        while True:
+            total = hands.total()
+            playable = hands.exists & ~hands.stuck & (total <= 20)
+            if not playable.any():
+                return
+            wantsToHit = hitTable[hands.soft().astype(np.int64), np.minimum(total, 21), upCards]
+            games = np.flatnonzero(playable & wantsToHit)
+            hands.stuck |= playable & ~wantsToHit
+            hands.addCards(games, self.draw(games))
+
+    def play(self, numberOfShoes=1):
+        """
+        Play blackjack for a number of shoes in every game.
+
+        Parameters
+        ----------
+        numberOfShoes : int
+            Number of shoes to play in each game
+
+        Returns
+        -------
+        history : array of float
+            Shape (players, games, rounds+1). The bank of each player (in
+            seat order) in each game at the start and after every round.
+            Games that finished early are padded with NaN. The number of
+            rounds each game played is stored in self.roundsPlayed.
+        """
+        G = self.numberOfGames
+        seatNumbers = sorted(self.seats)
+        players = [self.seats[seatNo] for seatNo in seatNumbers]
+        P = len(players)
+
+        policies = [PolicyTable(player) for player in players]
+        hitTables = [np.array(policy.hit, dtype=bool) for policy in policies]
+        doubleTables = [np.array(policy.double, dtype=bool) for policy in policies]
+        splitTables = [np.array(policy.split, dtype=bool) for policy in policies]
+
+        self.shoes = self.shoeSource(G)
+        self.position = np.zeros(G, dtype=np.int64)
+        self.hiLoCount = np.zeros(G, dtype=np.int64)
+        shoesPlayed = np.zeros(G, dtype=np.int64)
+        playing = np.ones(G, dtype=bool)
+
+        bank = np.array([np.full(G, player.bank, dtype=float) for player in players]).reshape(P, G)
+        hands = [[BatchHands(G) for h in range(MAX_HANDS)] for player in players]
+        dealer = BatchHands(G)
+        history = [bank.copy()]
+        self.roundsPlayed = np.zeros(G, dtype=np.int64)
+
+        while True:
+            # Shoes that have reached the cut card are replaced, or the game
+            # ends if it has played all its shoes
+            finished = playing & (self.position > self.penPosition)
+            if finished.any():
+                shoesPlayed[finished] += 1
+                playing &= shoesPlayed < numberOfShoes
+                renew = np.flatnonzero(finished & playing)
+                if renew.size:
+                    self.shoes[renew] = self.shoeSource(renew.size)
+                    self.position[renew] = 0
+                    self.hiLoCount[renew] = 0
+            if not playing.any():
+                break
+            self.roundsPlayed += playing
+
+            # Bets
+            decksRemaining = self.numberOfDecks - self.position / 52
+            trueCount = self.hiLoCount / decksRemaining
+            roundBetting = np.zeros((P, G))
+            payout = np.zeros((P, G))
+            for p, player in enumerate(players):
+                bet = np.broadcast_to(np.asarray(player.getBets(trueCount), dtype=float), (G,))
+                placed = playing & (bet <= bank[p]) & (bet > 0)
+                hands[p][0].reset(placed, np.where(placed, bet, 0))
+                hands[p][1].reset(False)
+                roundBetting[p] += hands[p][0].bet
+
+            # Deal
+            dealer.reset(playing)
+            playingGames = np.flatnonzero(playing)
+            for deal in range(2):
+                for p in range(P):
+                    games = np.flatnonzero(hands[p][0].exists)
+                    hands[p][0].addCards(games, self.draw(games))
+                dealer.addCards(playingGames, self.draw(playingGames))
+            upCards = VALUE[dealer.firstCard]
+
+            # Player actions
+            for p in range(P):
+                first, second = hands[p]
+                pairValue = VALUE[first.firstCard]
+                canAfford = bank[p] >= 2 * first.bet
+
+                split = (first.exists & (pairValue == VALUE[first.lastCard])
+                         & splitTables[p][pairValue, upCards] & canAfford)
+                games = np.flatnonzero(split)
+                second.exists[games] = True
+                second.bet[games] = first.bet[games]
+                roundBetting[p] += np.where(split, first.bet, 0)
+                second.addCards(games, first.lastCard[games])
+                first.removeLastCard(games)
+                first.addCards(games, self.draw(games))
+
+                double = (first.exists & ~split
+                          & doubleTables[p][first.soft().astype(np.int64), first.total(), upCards]
+                          & canAfford)
+                games = np.flatnonzero(double)
+                roundBetting[p] += np.where(double, first.bet, 0)
+                first.bet[games] *= 2
+                first.addCards(games, self.draw(games))
+                first.stuck[games] = True
+
+                self.hitUntilStuck(first, hitTables[p], upCards)
+
+                # Split hands have one card, take another then play normally
+                games = np.flatnonzero(second.exists)
+                second.addCards(games, self.draw(games))
+                self.hitUntilStuck(second, hitTables[p], upCards)
+
+            # Dealer action, hits soft 17
+            while True:
+                total = dealer.total()
+                hit = dealer.exists & ((total <= 16) | ((total == 17) & dealer.soft()))
+                if not hit.any():
+                    break
+                games = np.flatnonzero(hit)
+                dealer.addCards(games, self.draw(games))
+
+            # Settle up
+            dealerTotal = dealer.total()
+            dealerBust = dealerTotal > 21
+            for p in range(P):
+                for hand in hands[p]:
+                    tot = hand.total()
+                    live = hand.exists & (tot <= 21)
+                    blackjack = live & (tot == 21) & (hand.numberOfCards == 2)
+                    win = live & ~blackjack & (dealerBust | (tot > dealerTotal))
+                    push = live & ~blackjack & ~win & (tot == dealerTotal)
+                    payout[p] += np.select([blackjack, win, push],
+                                           [hand.bet*2.5, hand.bet*2, hand.bet], 0)
+            bank += payout - roundBetting
+            history.append(np.where(playing, bank, np.nan))
+
+        return np.stack(history, axis=-1)
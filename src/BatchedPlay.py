@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Play many tables with decisions gathered into batches.
+
+Each table's round is driven through Table.roundRequests. At every step the
+decision pending at each table is collected, and all hands waiting on
+players whose class decides in batches (Player.batchedDecisions) are passed
+to a single decideBatch call, so a policy backed by arrays decides them all
+at array speed. Other players are asked one hand at a time, as usual.
+
+Within one table decisions cannot be batched: the seats draw from the same
+shoe in turn, so a hand's decision changes which cards the later hands
+get. Batches therefore hold (at most) one decision from each table.
+"""
+
+from Decisions import DecisionBatch, decide
+
+
+class TableRun(object):
+    """
+    A game being played for a number of shoes, one decision at a time.
+    """
+
+    def __init__(self, game, numberOfShoes):
+        self.game = game
+        self.table = game.table
+        self.shoesLeft = numberOfShoes
+        self.requests = None
+        self.pending = None
+        self.roundsPlayed = 0
+        self.finished = numberOfShoes <= 0
+
+    def advance(self, action=None):
+        """
+        Play on until the next decision (stored in self.pending) or until the
+        game has played all its shoes.
+        """
+        while True:
+            if self.requests is None:
+                if self.table.shoe.finished(self.roundsPlayed):
+                    self.table.newShoe()
+                    self.roundsPlayed = 0
+                    self.shoesLeft -= 1
+                    if self.shoesLeft == 0:
+                        self.finished = True
+                        self.pending = None
+                        return
+                self.requests = self.table.roundRequests()
+                action = None
+            try:
+                if action is None:
+                    self.pending = next(self.requests)
+                else:
+                    self.pending = self.requests.send(action)
+                return
+            except StopIteration:
+                self.requests = None
+                self.roundsPlayed += 1
+
+
+def playBatched(games, numberOfShoes=1):
+    """
+    Play several games for a number of shoes, gathering the decisions of
+    every table into batches. Each game plays exactly as Game.play would.
+
+    Parameters
+    ----------
+    games : list of Game objects
+        The games, with players seated. No round hooks (profiler, logs or
+        RoundKernel) may be installed on their tables.
+    numberOfShoes : int
+        Number of shoes to play in each game
+
+    Returns
+    -------
+    numberOfBatches : int
+        Number of decideBatch calls made
+    """
+    # Rounds are played through Table.roundRequests, so a profiler, log or
+    # RoundKernel installed on a table would silently see nothing
+    for game in games:
+        if game.table.roundHooks:
+            raise ValueError('Cannot play batched over round hooks: ', game.table.roundHooks)
+    runs = [TableRun(game, numberOfShoes) for game in games]
+    for run in runs:
+        if not run.finished:
+            run.advance()
+    numberOfBatches = 0
+
+    while True:
+        running = [run for run in runs if not run.finished]
+        if not running:
+            return numberOfBatches
+
+        # Group the pending decisions by the class that will decide them
+        groups = {}
+        for run in running:
+            seat, hand, allowed = run.pending
+            player = seat.player
+            if player.batchedDecisions:
+                groups.setdefault(type(player), []).append(run)
+            else:
+                run.advance(decide(player, hand, allowed))
+
+        for group in groups.values():
+            batch = DecisionBatch([run.pending[1] for run in group],
+                                  [run.table.broadcast.dealersTotal for run in group],
+                                  [run.pending[2] for run in group])
+            actions = group[0].pending[0].player.decideBatch(batch)
+            numberOfBatches += 1
+            for run, action in zip(group, actions):
+                run.advance(int(action))
@@ -8,50 +8,155 @@ Created on Tue Oct 22 20:32:06 2019
 This class will contain all history about a game, easy for every player to see.
 """
 
-import utilityFunctions as ut
+from array import array
+from fractions import Fraction
+from math import lcm
+
+from Cards import NUMBER_OF_CARDS, NUMBER_OF_RANKS, NUMBER_OF_SUITS, CARD_RANK
+from CountingSystems import COUNTING_SYSTEMS, cardWeights
+
+# How much history a Broadcast keeps
+HISTORY_OFF = 'off'
+HISTORY_SHOE = 'shoe'
+HISTORY_FULL = 'full'
+
+# All running counts are packed into a single integer, with COUNT_BITS bits
+# for each counting system. Adding one precomputed integer per card updates
+# every system at once.
+COUNT_BITS = 32
+COUNT_OFFSET = 1 << (COUNT_BITS - 1)
+COUNT_MASK = (1 << COUNT_BITS) - 1
 
 class Broadcast(object):
     """
     A public class that contains all information available to all players.
     Within this class, players can see the up card of the dealer, and any 
-    counts that they want to use. 
+    counts that they want to use. It also tracks how many cards of each rank
+    remain in the shoe.
+    
+    Parameters
+    ----------
+    history : str
+        How much history to keep. 'off' keeps only the counts players use,
+        'shoe' keeps the cards and Hi-Lo counts of the current shoe and 'full'
+        keeps them for every shoe.
+    countingSystems : tuple of str
+        Counting systems to keep counts for from the start, see
+        CountingSystems.py. More can be added with registerCount.
     """
     
-    def __init__(self):
-        self.shoeHistory = []
-        self.hiLoCountHistory = [0]
-        self.hiLoCount = 0
+    __slots__ = ('history', 'keepHistory', 'shoeHistory', 'hiLoCountHistory',
+                 'cardsSeen', 'dealersTotal', 'holeCard', 'numberOfDecks', 'remaining',
+                 'counts', 'countDeltas', 'countOffset', 'countSystems')
+    
+    def __init__(self, history=HISTORY_OFF, countingSystems=('HiLo',)):
+        if history not in (HISTORY_OFF, HISTORY_SHOE, HISTORY_FULL):
+            raise ValueError('Unknown history policy: ', history)
+        self.history = history
+        self.keepHistory = history != HISTORY_OFF
+        self.shoeHistory = array('B')
+        self.hiLoCountHistory = array('l')
+        self.cardsSeen = 0
         self.dealersTotal = 0
+        # The dealer's hole card while it is face down, if it has been counted
+        self.holeCard = None
         self.numberOfDecks = None
         
-    def reset(self):
-        self.shoeHistory = []
-        self.hiLoCount = 0
+        # Number of cards of each rank left in the shoe, once it is known
+        # how many decks the shoe has
+        self.remaining = None
+        
+        # Packed running counts, and what each card adds to them
+        self.counts = 0
+        self.countDeltas = [0] * NUMBER_OF_CARDS
+        self.countOffset = 0
+        self.countSystems = {}
+        for name in countingSystems:
+            self.registerCount(name)
+        
+    def reset(self, numberOfDecks=None):
+        """
+        Forget the previous shoe and start a new one.
+        
+        Parameters
+        ----------
+        numberOfDecks : int
+            Number of decks in the new shoe, if it has changed
+        """
+        if numberOfDecks is not None:
+            self.numberOfDecks = numberOfDecks
+        if self.numberOfDecks is not None:
+            self.remaining = [self.numberOfDecks * NUMBER_OF_SUITS] * NUMBER_OF_RANKS
+        if self.history == HISTORY_SHOE:
+            self.shoeHistory = array('B')
+            self.hiLoCountHistory = array('l')
+        self.cardsSeen = 0
+        self.counts = 0
         self.dealersTotal = 0
+        self.holeCard = None
     
-    @property
-    def dealersTotal(self):
-        return self.__dealersTotal
+    def registerCount(self, name, weights=None):
+        """
+        Start keeping a running count for a counting system. Cards already
+        seen this shoe are counted.
+        
+        Parameters
+        ----------
+        name : str
+            Name of the system
+        weights : tuple
+            Weight of each card value, A to 10. Only needed for systems not
+            in CountingSystems.COUNTING_SYSTEMS.
+        """
+        if name in self.countSystems:
+            return
+        if weights is None:
+            weights = COUNTING_SYSTEMS[name]
+        
+        # Fractional weights (e.g. Wong Halves) are counted in integer units
+        scale = 1
+        for weight in weights:
+            scale = lcm(scale, Fraction(weight).limit_denominator().denominator)
+        
+        shift = COUNT_BITS * len(self.countSystems)
+        units = [round(weight * scale) for weight in cardWeights(weights)]
+        for card, unit in enumerate(units):
+            self.countDeltas[card] += unit << shift
+        self.countOffset += COUNT_OFFSET << shift
+        self.countSystems[name] = (shift, scale)
+        
+        # Catch up with the cards already dealt this shoe
+        if self.remaining is not None:
+            count = 0
+            for rank, remaining in enumerate(self.remaining):
+                seen = self.numberOfDecks * NUMBER_OF_SUITS - remaining
+                count += seen * units[rank * NUMBER_OF_SUITS]
+            self.counts += count << shift
     
-    @dealersTotal.setter
-    def dealersTotal(self, tot):
-        self.__dealersTotal = tot
+    def runningCount(self, name='HiLo'):
+        """
+        Return the running count of a registered counting system.
+        """
+        shift, scale = self.countSystems[name]
+        count = (((self.counts + self.countOffset) >> shift) & COUNT_MASK) - COUNT_OFFSET
+        return count if scale == 1 else count / scale
+    
+    def trueCount(self, name='HiLo'):
+        """
+        Return the true count of a registered counting system: running count
+        / numberOfDecksRemaining
+        """
+        return self.runningCount(name) / (self.numberOfDecks - self.cardsSeen/52)
     
-    def updateHiLo(self, card):
-        val = ut.getNumber(card)
-        if val > 9:
-            self.hiLoCount -= 1
-        elif val < 7:
-            self.hiLoCount += 1
-        self.hiLoCountHistory.append(self.hiLoCount)
+    @property
+    def hiLoCount(self):
+        return self.runningCount('HiLo')
     
     def trueHiLoCount(self):
         """
         Return the true HiLo count: hiLoCount / numberOfDecksRemaining
         """
-        self.numberOfDecksRemaining = self.numberOfDecks - len(self.shoeHistory)/52
-        return self.hiLoCount / self.numberOfDecksRemaining
-        # return self.hiLoCount / self.numberOfDecks
+        return self.trueCount('HiLo')
 
     
     def append(self, card):
@@ -61,10 +166,60 @@ class Broadcast(object):
         
         Parameters
         ----------
-        card : str
+        card : int
             Card to add to the history
         """
-        self.shoeHistory.append(card)
+        self.cardsSeen += 1
+        
+        # Update the counts of every registered system
+        self.counts += self.countDeltas[card]
+        
+        # One fewer of this rank left in the shoe
+        self.remaining[CARD_RANK[card]] -= 1
+        
+        if self.keepHistory:
+            self.shoeHistory.append(card)
+            self.hiLoCountHistory.append(self.hiLoCount)
+    
+    def remainingCards(self):
+        """
+        Snapshot of how many cards of each rank are left in the shoe.
+        
+        Returns
+        -------
+        remaining : tuple of int
+            Number left of each rank, A to K
+        """
+        return tuple(self.remaining)
+    
+    def compositionKey(self):
+        """
+        Hashable key for the composition of the rest of the shoe, counting
+        cards by value. Shoes with the same key are the same for play.
         
-        # Here we change the count according to the system we want to lose
-        self.updateHiLo(card)
+        Returns
+        -------
+        key : tuple of int
+            Number left of each value, A, 2, ..., 9, 10 (tens include J, Q
+            and K)
+        """
+        remaining = self.remaining
+        return tuple(remaining[:9]) + (remaining[9] + remaining[10] + remaining[11] + remaining[12],)
+    
+    def playerCompositionKey(self):
+        """
+        compositionKey as the players see it. The dealer's hole card has been
+        counted, but while it is face down the players do not know it, so it
+        is counted as still in the shoe. This is the composition the hole
+        card was drawn from.
+        
+        Returns
+        -------
+        key : tuple of int
+            Number left of each value, as compositionKey
+        """
+        if self.holeCard is None:
+            return self.compositionKey()
+        remaining = list(self.remaining)
+        remaining[CARD_RANK[self.holeCard]] += 1
+        return tuple(remaining[:9]) + (remaining[9] + remaining[10] + remaining[11] + remaining[12],)
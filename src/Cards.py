@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Integer card encoding.
+
+A card is a small int with the rank and suit packed together,
+
+    card = rank * 4 + suit
+
+where rank is 0 (ace) to 12 (king) and suit is 0 to 3 (hearts, diamonds,
+clubs, spades). This gives 52 distinct cards, 0 to 51, so all per-card
+properties are precomputed lookup tables indexed directly by the card.
+Strings such as '10h' are only built when cards are displayed.
+"""
+
+SUITS = ('h', 'd', 'c', 's')
+RANKS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
+NUMBER_OF_SUITS = len(SUITS)
+NUMBER_OF_RANKS = len(RANKS)
+NUMBER_OF_CARDS = NUMBER_OF_SUITS * NUMBER_OF_RANKS
+
+# Blackjack value of each rank, aces counted high
+RANK_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+
+# Blackjack value of each rank, aces counted low
+RANK_HARD_VALUES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+
+# Hi-Lo count weight of each rank
+RANK_HILO = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+
+
+def encodeCard(rank, suit):
+    """
+    Pack a rank and suit into a card.
+
+    Parameters
+    ----------
+    rank : int
+        Rank index, 0 (ace) to 12 (king)
+    suit : int
+        Suit index, 0 to 3
+
+    Returns
+    -------
+    card : int
+        The encoded card
+    """
+    return rank * NUMBER_OF_SUITS + suit
+
+
+# Lookup tables indexed by card
+CARD_RANK = tuple(card // NUMBER_OF_SUITS for card in range(NUMBER_OF_CARDS))
+CARD_SUIT = tuple(card % NUMBER_OF_SUITS for card in range(NUMBER_OF_CARDS))
+CARD_VALUE = tuple(RANK_VALUES[rank] for rank in CARD_RANK)
+CARD_HARD_VALUE = tuple(RANK_HARD_VALUES[rank] for rank in CARD_RANK)
+CARD_IS_ACE = tuple(rank == 0 for rank in CARD_RANK)
+CARD_HILO = tuple(RANK_HILO[rank] for rank in CARD_RANK)
+CARD_STRINGS = tuple(RANKS[CARD_RANK[card]] + SUITS[CARD_SUIT[card]]
+                     for card in range(NUMBER_OF_CARDS))
+
+
+def cardToString(card):
+    """
+    Render a card for display, e.g. '10h'.
+
+    Parameters
+    ----------
+    card : int
+        The encoded card
+
+    Returns
+    -------
+    string : str
+        Human readable card
+    """
+    return CARD_STRINGS[card]
+
+
+def stringToCard(string):
+    """
+    Encode a card from its display string, e.g. 'Qs'.
+
+    Parameters
+    ----------
+    string : str
+        Human readable card
+
+    Returns
+    -------
+    card : int
+        The encoded card
+    """
+    return encodeCard(RANKS.index(string[:-1]), SUITS.index(string[-1]))
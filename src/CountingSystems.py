@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Card counting systems.
+
+Each system is a weight for every card value, listed in the order
+A, 2, 3, 4, 5, 6, 7, 8, 9, 10 (tens include J, Q and K). Any system can be
+registered with a Broadcast, see Broadcast.registerCount.
+"""
+
+from Cards import NUMBER_OF_CARDS, CARD_VALUE
+
+COUNTING_SYSTEMS = {
+    #               A,  2,  3,  4,   5,  6,  7,  8,   9, 10
+    'HiLo':       (-1,  1,  1,  1,   1,  1,  0,  0,   0, -1),
+    'KO':         (-1,  1,  1,  1,   1,  1,  1,  0,   0, -1),
+    'HiOptI':     ( 0,  0,  1,  1,   1,  1,  0,  0,   0, -1),
+    'HiOptII':    ( 0,  1,  1,  2,   2,  1,  1,  0,   0, -2),
+    'OmegaII':    ( 0,  1,  1,  2,   2,  2,  1,  0,  -1, -2),
+    'Zen':        (-1,  1,  1,  2,   2,  2,  1,  0,   0, -2),
+    'WongHalves': (-1, .5,  1,  1, 1.5,  1, .5,  0, -.5, -1),
+}
+
+
+def valueIndex(value):
+    """
+    Position of a card value in a system's weights.
+
+    Parameters
+    ----------
+    value : int
+        Card value, 2 to 11 (aces are 11)
+
+    Returns
+    -------
+    index : int
+        Index into the weights, 0 (ace) to 9 (ten)
+    """
+    return 0 if value == 11 else value - 1
+
+
+def cardWeights(weights):
+    """
+    Expand a system's weights by value into a weight for every card.
+
+    Parameters
+    ----------
+    weights : tuple
+        Weight of each value, A to 10
+
+    Returns
+    -------
+    cardWeights : tuple
+        Weight of each encoded card
+    """
+    return tuple(weights[valueIndex(CARD_VALUE[card])] for card in range(NUMBER_OF_CARDS))
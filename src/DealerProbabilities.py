@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exact dealer outcome probabilities.
+
+Given the dealer's up-card and the composition of the rest of the shoe,
+works out the exact probability of each final dealer total by following
+every way the dealer can draw, removing each card from the shoe as it is
+drawn. Results are cached by composition.
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+
+from CountingSystems import valueIndex
+from HandSeatAndDealer import Dealer
+
+# Final dealer totals, in the order probabilities are returned
+OUTCOMES = (17, 18, 19, 20, 21, 'bust')
+BUST = len(OUTCOMES) - 1
+
+# Value of each position in a composition key (see Broadcast.compositionKey),
+# aces counted low
+HARD_VALUES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+# Position of a card value in a composition key. Composition keys are
+# ordered ace, 2, ..., 10 like counting system weights, so this is the same
+# mapping
+compositionIndex = valueIndex
+
+
+def removeCard(composition, index):
+    """
+    The composition with one card of the given index removed.
+    """
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
+
+
+class DealerProbabilities(object):
+    """
+    Exact probabilities of the dealer's final total. The dealer draws their
+    hole card and then plays by the rules of Dealer.
+
+    Parameters
+    ----------
+    hitsSoft17 : bool
+        Does the dealer hit soft 17? Defaults to the rule Dealer implements.
+    maxSize : int
+        Maximum number of distributions to keep cached. The least recently
+        used are dropped first.
+    path : str
+        Optional file to persist the cache to. It is loaded now if it exists
+        and written by save().
+    """
+
+    def __init__(self, hitsSoft17=Dealer.hitsSoft17, maxSize=100000, path=None):
+        self.hitsSoft17 = hitsSoft17
+        self.maxSize = maxSize
+        self.path = path
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def distribution(self, upCard, composition):
+        """
+        Probability of each final dealer total.
+
+        Parameters
+        ----------
+        upCard : int
+            Value of the dealer's up-card, 2 to 11 (aces are 11)
+        composition : tuple of int
+            Cards left of each value that the dealer draws from. The up-card
+            must already be removed and the hole card must not be, as given by
+            Broadcast.playerCompositionKey during a round.
+
+        Returns
+        -------
+        probabilities : tuple of float
+            Probability of each of OUTCOMES: 17, 18, 19, 20, 21 and bust
+        """
+        key = (upCard, composition)
+        cache = self.cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        self.misses += 1
+
+        index = compositionIndex(upCard)
+        probabilities = tuple(self.play(HARD_VALUES[index], index == 0, composition, {}))
+
+        cache[key] = probabilities
+        if len(cache) > self.maxSize:
+            cache.popitem(last=False)
+        return probabilities
+
+    def play(self, hardTotal, hasAce, composition, memo):
+        """
+        Outcome probabilities for a dealer hand, drawing from composition.
+
+        Parameters
+        ----------
+        hardTotal : int
+            Total of the hand counting aces as 1
+        hasAce : bool
+            Does the hand hold an ace?
+        composition : tuple of int
+            Cards left of each value
+        memo : dict
+            Results for states already visited in this calculation
+
+        Returns
+        -------
+        probabilities : list of float
+            Probability of each of OUTCOMES
+        """
+        state = (hardTotal, hasAce, composition)
+        if state in memo:
+            return memo[state]
+
+        probabilities = [0.] * len(OUTCOMES)
+        numberOfCards = sum(composition)
+        for index, count in enumerate(composition):
+            if not count:
+                continue
+            p = count / numberOfCards
+            hard = hardTotal + HARD_VALUES[index]
+            ace = hasAce or index == 0
+            soft = ace and hard <= 11
+            total = hard + 10 if soft else hard
+            if total > 21:
+                probabilities[BUST] += p
+            elif total < 17 or (total == 17 and soft and self.hitsSoft17):
+                rest = self.play(hard, ace, removeCard(composition, index), memo)
+                for outcome, q in enumerate(rest):
+                    probabilities[outcome] += p * q
+            else:
+                probabilities[total - 17] += p
+
+        memo[state] = probabilities
+        return probabilities
+
+    def save(self, path=None):
+        """
+        Write the cache to disk.
+
+        Parameters
+        ----------
+        path : str
+            File to write, defaults to the path given when created
+        """
+        path = path if path is not None else self.path
+        with open(path, 'wb') as f:
+            pickle.dump({'hitsSoft17': self.hitsSoft17, 'cache': dict(self.cache)}, f)
+
+    def load(self, path):
+        """
+        Add a cache written by save() to this one.
+
+        Parameters
+        ----------
+        path : str
+            File to read
+        """
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+        if saved['hitsSoft17'] != self.hitsSoft17:
+            raise ValueError('Cache in {} is for a different soft 17 rule'.format(path))
+        for key, probabilities in saved['cache'].items():
+            self.cache[key] = probabilities
+        while len(self.cache) > self.maxSize:
+            self.cache.popitem(last=False)
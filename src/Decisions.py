@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Actions and batches of decisions.
+
+Besides answering the table one question at a time (wantsToSplit,
+wantsToDoubleDown, wantsToHit), a player can decide many hands at once:
+given a DecisionBatch of hand states, dealer up-cards and the actions
+allowed for each hand, Player.decideBatch returns one action per hand. See
+BatchedPlay.py, which gathers decisions across many tables.
+"""
+
+import numpy as np
+
+from Cards import CARD_VALUE
+
+# Actions
+STAND = 0
+HIT = 1
+DOUBLE = 2
+SPLIT = 3
+
+# Bit of each action in an allowed-actions mask
+ALLOW_STAND = 1 << STAND
+ALLOW_HIT = 1 << HIT
+ALLOW_DOUBLE = 1 << DOUBLE
+ALLOW_SPLIT = 1 << SPLIT
+
+
+class DecisionBatch(object):
+    """
+    Hands waiting for a decision, with their states as arrays.
+
+    Parameters
+    ----------
+    hands : list of Hand objects
+        The hands
+    upCards : list of int
+        Value of the dealer's up-card at each hand's table (aces are 11)
+    allowed : list of int
+        Mask of the actions allowed for each hand, see ALLOW_STAND etc.
+
+    Attributes
+    ----------
+    totals : array of int
+        Total of each hand
+    soft : array of int
+        1 if the hand is soft, 0 if not
+    pairValues : array of int
+        Value of the pair if the hand may be split, 0 if not
+    """
+
+    def __init__(self, hands, upCards, allowed):
+        self.hands = hands
+        self.upCards = np.array(upCards, dtype=np.int64)
+        self.allowed = np.array(allowed, dtype=np.int64)
+        self.totals = np.array([hand.total for hand in hands], dtype=np.int64)
+        self.soft = np.array([hand.soft for hand in hands], dtype=np.int64)
+        self.pairValues = np.array([CARD_VALUE[hand.cards[0]] if mask & ALLOW_SPLIT else 0
+                                    for hand, mask in zip(hands, allowed)], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.hands)
+
+
+def decide(player, hand, allowed):
+    """
+    Decide one hand by asking the player's wantsToSplit, wantsToDoubleDown
+    and wantsToHit in turn, as Table.playerActions does.
+
+    Parameters
+    ----------
+    player : Player object
+        The player deciding
+    hand : Hand object
+        The hand
+    allowed : int
+        Mask of the actions allowed
+
+    Returns
+    -------
+    action : int
+        The action chosen
+    """
+    if allowed & ALLOW_SPLIT and player.wantsToSplit(hand):
+        return SPLIT
+    if allowed & ALLOW_DOUBLE and player.wantsToDoubleDown(hand):
+        return DOUBLE
+    if allowed & ALLOW_HIT and player.wantsToHit(hand):
+        return HIT
+    return STAND
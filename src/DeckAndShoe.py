@@ -9,24 +9,50 @@ Stuff involving cards
 """
 
 import random
+from itertools import accumulate
+from Cards import SUITS, RANKS, NUMBER_OF_CARDS, encodeCard
 
 class Deck(object):
     """
-    A single deck of cards.
+    A single deck of cards. Cards are integer encoded, see Cards.py.
     """
     
     def __init__(self):
         
-        self.suits = ['h', 'd', 'c', 's']
-        self.value = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-        self.cards = [ value + suit for suit in self.suits for value in self.value]
+        self.suits = range(len(SUITS))
+        self.value = range(len(RANKS))
+        self.cards = [encodeCard(value, suit) for suit in self.suits for value in self.value]
         # Because maybe this will be usefull?
         self.originalCards = self.cards.copy()
 
 
+# Unshuffled shoes, by number of decks. Built once and never modified.
+shoeTemplates = {}
+
+def shoeTemplate(numberOfDecks):
+    """
+    The cards of an unshuffled shoe, in deck order.
+    
+    Parameters
+    ----------
+    numberOfDecks : int
+        Number of decks in the shoe
+        
+    Returns
+    -------
+    template : tuple of int
+        Every card in the shoe
+    """
+    if numberOfDecks not in shoeTemplates:
+        shoeTemplates[numberOfDecks] = tuple(Deck().cards) * numberOfDecks
+    return shoeTemplates[numberOfDecks]
+
+
 class Shoe(object):
     """
-    A single shoe, containing multiple decks.
+    A single shoe, containing multiple decks. Once shuffled the cards are
+    never moved, the shoe deals by advancing a cursor through them. The shoe
+    is reshuffled in place, reusing its card buffer, to start the next shoe.
     
     Parameters 
     ----------
@@ -34,23 +60,69 @@ class Shoe(object):
         Broadcast object
     numberOfDecks : int 
         Number of decks to use in this shoe
+    rng : random.Random
+        Random number generator used to shuffle. A fresh, unseeded one is
+        used if not given.
+    library : ShoeLibrary object
+        If given, shoes are dealt from this library of pre-shuffled shoes
+        instead of being shuffled, and its number of decks is used.
     """
-    def __init__(self, broadcast, numberOfDecks=6):
+    
+    # Every card dealt is shown to the broadcast
+    broadcastsCards = True
+    
+    def __init__(self, broadcast, numberOfDecks=6, rng=None, library=None):
         
-        self.decks = []
-        self.cards = []
-        self.penPosition = None
+        self.rng = rng if rng is not None else random.Random()
         self.broadcast = broadcast
-        self.broadcast.numberOfDecks = numberOfDecks
-        for i in range(numberOfDecks):
-            self.decks.append(Deck())
-            self.cards += self.decks[i].cards
-            
-        random.shuffle(self.cards)
+        self.library = library
+        if library is not None:
+            numberOfDecks = library.numberOfDecks
+        self.numberOfDecks = numberOfDecks
+        self.template = shoeTemplate(numberOfDecks)
+        self.cards = list(self.template)
+        self.reshuffle()
+        
+    def reshuffle(self):
+        """
+        Start a new shoe: put every card back, shuffle (or take the next
+        shoe from the library) and remove the cut card.
+        """
+        cards = self.cards
+        if self.library is not None:
+            cards[:] = self.library.nextShoe()
+        else:
+            cards[:] = self.template
+            self.rng.shuffle(cards)
+        self.startShoe()
+        
+    def setCards(self, cards):
+        """
+        Start a new shoe that deals the given cards in order, e.g. to replay
+        a recorded shoe.
+        
+        Parameters
+        ----------
+        cards : list of int
+            Every card in the shoe, in dealing order
+        """
+        self.cards[:] = cards
+        self.startShoe()
+        
+    def startShoe(self):
+        """
+        Deal the shoe from the top again, with the cut card removed.
+        """
+        self.broadcast.reset(self.numberOfDecks)
+        
+        # Index of the next card to deal
+        self.position = 0
+        # Until penetrated, the cut card sits behind the last card
+        self.penPosition = len(self.cards)
         
     def penetrate(self, position):
         """
-        Penetrate the deck with the None card.
+        Penetrate the deck with the cut card.
         
         Parameters
         ----------
@@ -58,28 +130,146 @@ class Shoe(object):
             Card number at which to penetrate deck 
         """
         self.penPosition = position
-        lastCard = self.cards[-1]
-        self.cards[position+1:] = self.cards[position:-1]
-        self.cards[position] = None
-        self.cards.append(lastCard)
         
-    def nextCard(self):
+    def cutCardReached(self):
         """
-        Used everytime a card is requested. This removes the card at index 0, 
-        returns is, and shifts all cards forward by one.
+        Has the cut card come out? The cut card is reached once more than
+        penPosition cards have been dealt, after which the current round is
+        the last in this shoe.
         
         Returns
         -------
-        card : str
-            String defining the next card out the shoe
+        reached : bool
+            Has the cut card been dealt?
         """
-        card = self.cards[0]
-        self.cards = self.cards[1:]
+        return self.position > self.penPosition
         
-        if card is not None:
-            self.broadcast.append(card)
-            return card
-        else:
-            return self.nextCard()
+    def finished(self, roundsPlayed):
+        """
+        Should this shoe end, now that roundsPlayed rounds have been played
+        from it? A shoe ends once the cut card has come out.
+        
+        Parameters
+        ----------
+        roundsPlayed : int
+            Number of rounds played from this shoe
+        
+        Returns
+        -------
+        finished : bool
+            Should a new shoe be started?
+        """
+        return self.position > self.penPosition
+        
+    def nextCard(self):
+        """
+        Used everytime a card is requested. Returns the card under the cursor
+        and moves the cursor on by one.
+        
+        Returns
+        -------
+        card : int
+            The next card out the shoe
+        """
+        card = self.cards[self.position]
+        self.position += 1
+        self.broadcast.append(card)
+        return card
+
+
+class InfiniteShoe(object):
+    """
+    An infinite deck, or a continuous shuffling machine: every card is an
+    independent draw from fixed card probabilities, so play never depends
+    on the cards already dealt. Cards are drawn in bulk, batchSize at a time.
+    There is no cut card, instead a shoe lasts roundsPerShoe rounds (which
+    only matters to anything kept per shoe, e.g. PerShoeRecorder).
+    
+    Cards are not shown to the broadcast, as there is nothing to count.
     
-    
\ No newline at end of file
+    Parameters 
+    ----------
+    broadcast : object
+        Broadcast object
+    numberOfDecks : int 
+        Number of decks the broadcast is told the shoe has
+    rng : random.Random
+        Random number generator used to draw cards. A fresh, unseeded one
+        is used if not given.
+    roundsPerShoe : int
+        Number of rounds in each shoe
+    batchSize : int
+        Number of cards drawn at once
+    weights : list of float
+        Relative probability of each encoded card, e.g. to model a
+        particular composition. Every card is equally likely if not given.
+    """
+    
+    broadcastsCards = False
+    
+    def __init__(self, broadcast, numberOfDecks=6, rng=None, roundsPerShoe=100,
+                 batchSize=4096, weights=None):
+        
+        self.rng = rng if rng is not None else random.Random()
+        self.broadcast = broadcast
+        self.numberOfDecks = numberOfDecks
+        self.roundsPerShoe = roundsPerShoe
+        self.batchSize = batchSize
+        self.population = range(NUMBER_OF_CARDS)
+        self.cumulativeWeights = list(accumulate(weights)) if weights is not None else None
+        self.cards = []
+        self.index = 0
+        self.penPosition = None
+        self.drawBatch()
+        self.reshuffle()
+        
+    def drawBatch(self):
+        """
+        Draw the next batch of cards.
+        """
+        self.cards = self.rng.choices(self.population, cum_weights=self.cumulativeWeights,
+                                      k=self.batchSize)
+        self.index = 0
+        
+    def reshuffle(self):
+        """
+        Start a new shoe.
+        """
+        self.broadcast.reset(self.numberOfDecks)
+        # Number of cards dealt from this shoe
+        self.position = 0
+        
+    def penetrate(self, position):
+        """
+        There is no cut card, so this does nothing.
+        """
+        pass
+        
+    def cutCardReached(self):
+        """
+        There is no cut card, so it is never reached.
+        """
+        return False
+        
+    def finished(self, roundsPlayed):
+        """
+        Should this shoe end, now that roundsPlayed rounds have been played
+        from it? A shoe ends after roundsPerShoe rounds.
+        """
+        return roundsPlayed >= self.roundsPerShoe
+        
+    def nextCard(self):
+        """
+        Draw the next card.
+        
+        Returns
+        -------
+        card : int
+            The card drawn
+        """
+        if self.index == self.batchSize:
+            self.drawBatch()
+        card = self.cards[self.index]
+        self.index += 1
+        self.position += 1
+        return card
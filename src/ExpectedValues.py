@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exact expected values of playing decisions.
+
+For a hand, the dealer's up-card and the composition of the rest of the
+shoe, works out the expected return per unit bet of standing, hitting,
+doubling and splitting, removing every card from the shoe as it is drawn.
+Payouts follow Table.settleUp: a two card 21 (also after a split) pays 3:2
+whatever the dealer holds. Values are kept in a transposition table keyed
+by hand state, up-card and composition, so states reached again (e.g. the
+next decision after hitting) are looked up rather than recomputed.
+
+Working out the dealer's outcomes for every composition the player might
+draw to is by far the most expensive part. With exact=False the dealer's
+outcomes are instead taken at the composition when the decision is made,
+a much faster approximation that is very close in a six deck shoe.
+"""
+
+from collections import OrderedDict
+
+from DealerProbabilities import (DealerProbabilities, HARD_VALUES, BUST,
+                                 compositionIndex, removeCard)
+
+# Net return of a two card 21
+BLACKJACK = 1.5
+
+
+class ExpectedValues(object):
+    """
+    Expected values of actions, with a bounded transposition table.
+
+    Parameters
+    ----------
+    dealerProbabilities : DealerProbabilities object
+        Dealer outcome engine to use, a new one is made if not given
+    maxSize : int
+        Maximum number of states kept in the transposition table. The least
+        recently used are dropped first.
+    exact : bool
+        Remove the player's cards from the shoe before working out the
+        dealer's outcomes? If not, the dealer's outcomes are taken at the
+        composition when the decision is made.
+    """
+
+    def __init__(self, dealerProbabilities=None, maxSize=100000, exact=True):
+        self.dealer = dealerProbabilities if dealerProbabilities is not None else DealerProbabilities()
+        self.maxSize = maxSize
+        self.exact = exact
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        Look a state up in the transposition table.
+
+        Returns
+        -------
+        value : object
+            The stored value, or None if the state is not stored
+        """
+        table = self.table
+        if key in table:
+            self.hits += 1
+            table.move_to_end(key)
+            return table[key]
+        self.misses += 1
+        return None
+
+    def store(self, key, value):
+        table = self.table
+        table[key] = value
+        if len(table) > self.maxSize:
+            table.popitem(last=False)
+        return value
+
+    def stand(self, total, upCard, dealerComposition):
+        """
+        Expected value of standing on a total of at most 21 that is not a
+        two card 21.
+        """
+        key = ('stand', total, upCard, dealerComposition)
+        value = self.lookup(key)
+        if value is not None:
+            return value
+        probabilities = self.dealer.distribution(upCard, dealerComposition)
+        win = probabilities[BUST]
+        push = 0.
+        for dealerTotal, p in zip(range(17, 22), probabilities):
+            if total > dealerTotal:
+                win += p
+            elif total == dealerTotal:
+                push = p
+        return self.store(key, 2 * win + push - 1)
+
+    def draws(self, hardTotal, hasAce, composition, dealerComposition):
+        """
+        Every card that can be drawn next and the hand that results.
+
+        Yields
+        ------
+        p : float
+            Probability of drawing the card
+        hardTotal : int
+            New hard total
+        hasAce : bool
+            Does the new hand hold an ace?
+        total : int
+            New total
+        composition : tuple of int
+            Composition after the draw
+        dealerComposition : tuple of int
+            Composition the dealer's outcomes are worked out from after the
+            draw
+        """
+        numberOfCards = sum(composition)
+        for index, count in enumerate(composition):
+            if count:
+                hard = hardTotal + HARD_VALUES[index]
+                ace = hasAce or index == 0
+                total = hard + 10 if ace and hard <= 11 else hard
+                rest = removeCard(composition, index)
+                yield (count / numberOfCards, hard, ace, total, rest,
+                       rest if self.exact else dealerComposition)
+
+    def best(self, hardTotal, hasAce, upCard, composition, dealerComposition):
+        """
+        Expected value of playing a hand of three or more cards as well as
+        possible, by standing or hitting.
+        """
+        total = hardTotal + 10 if hasAce and hardTotal <= 11 else hardTotal
+        if total > 21:
+            return -1.
+        stand = self.stand(total, upCard, dealerComposition)
+        if total == 21:
+            return stand
+        return max(stand, self.hit(hardTotal, hasAce, upCard, composition, dealerComposition))
+
+    def hit(self, hardTotal, hasAce, upCard, composition, dealerComposition):
+        """
+        Expected value of hitting once and then playing as well as possible.
+        """
+        key = ('hit', hardTotal, hasAce, upCard, composition, dealerComposition)
+        value = self.lookup(key)
+        if value is not None:
+            return value
+        value = 0.
+        for p, hard, ace, total, rest, dealerRest in self.draws(hardTotal, hasAce, composition,
+                                                                dealerComposition):
+            value += p * self.best(hard, ace, upCard, rest, dealerRest)
+        return self.store(key, value)
+
+    def double(self, hardTotal, hasAce, upCard, composition):
+        """
+        Expected value of doubling: twice the bet, exactly one more card.
+        """
+        value = 0.
+        for p, hard, ace, total, rest, dealerRest in self.draws(hardTotal, hasAce, composition,
+                                                                composition):
+            value += p * (self.stand(total, upCard, dealerRest) if total <= 21 else -1.)
+        return 2 * value
+
+    def split(self, pairValue, upCard, composition):
+        """
+        Expected value of splitting a pair, per original bet. Each hand takes
+        one card, which may make a two card 21, and is then played by standing
+        or hitting. The two hands are treated as drawing from the same
+        composition.
+        """
+        index = compositionIndex(pairValue)
+        value = 0.
+        for p, hard, ace, total, rest, dealerRest in self.draws(HARD_VALUES[index], index == 0,
+                                                                composition, composition):
+            value += p * (BLACKJACK if total == 21 else self.best(hard, ace, upCard, rest, dealerRest))
+        return 2 * value
+
+    def actions(self, hand, upCard, composition, pairValue=None):
+        """
+        Expected values of every action available to a hand.
+
+        Parameters
+        ----------
+        hand : Hand object
+            The hand being played
+        upCard : int
+            Value of the dealer's up-card, 2 to 11 (aces are 11)
+        composition : tuple of int
+            Cards left of each value, including the dealer's hole card, see
+            Broadcast.playerCompositionKey
+        pairValue : int
+            Value of the pair, if the hand is a pair that may be split
+
+        Returns
+        -------
+        values : tuple of float
+            Expected values of standing, hitting, doubling and splitting. None
+            for actions that are not available.
+        """
+        twoCards = len(hand.cards) == 2
+        key = ('actions', hand.hardTotal, bool(hand.numberOfAces), twoCards,
+               pairValue, upCard, composition)
+        values = self.lookup(key)
+        if values is not None:
+            return values
+
+        hardTotal, hasAce, total = hand.hardTotal, bool(hand.numberOfAces), hand.total
+        if total > 21:
+            stand = hit = -1.
+        elif hand.blackjack:
+            stand = hit = BLACKJACK
+        else:
+            stand = self.stand(total, upCard, composition)
+            hit = self.hit(hardTotal, hasAce, upCard, composition, composition) if total < 21 else stand
+        double = self.double(hardTotal, hasAce, upCard, composition) if twoCards else None
+        split = self.split(pairValue, upCard, composition) if pairValue else None
+        return self.store(key, (stand, hit, double, split))
@@ -5,10 +5,17 @@ This class contains the main methods for playing a game of blackjack. We will
 try to replicate how it is played in casinos.
 """
 
+import random
+
 from Table import Table
 from HandSeatAndDealer import Seat
 import utilityFunctions as ut
+from Cards import cardToString
 from Broadcast import Broadcast
+from Profiling import RoundProfiler
+from RoundKernel import RoundKernel
+from RoundLog import RoundLogWriter
+from ReplayLog import ReplayRecorder
 
 class Game(object):
     """
@@ -25,13 +32,36 @@ class Game(object):
         
     penPosition : int
         Position to penetrate the deck
+        
+    seed : int
+        Seed for this game's random number generator. Games with the same
+        seed are dealt the same sequence of shoes.
+        
+    broadcastHistory : str
+        How much card and count history the broadcast keeps: 'off', 'shoe'
+        or 'full'
+        
+    shoeLibrary : ShoeLibrary object
+        Deal pre-shuffled shoes from this library instead of shuffling
+        
+    roundsPerShoe : int
+        If given, play with an infinite deck (or continuous shuffling
+        machine) instead of a finite shoe, see InfiniteShoe. A shoe then
+        lasts this many rounds. Cannot be combined with shoeLibrary.
     """
     
-    def __init__(self, numberOfSeats=6, randomPen=False, penPosition=250):
+    def __init__(self, numberOfSeats=6, randomPen=False, penPosition=250, seed=None,
+                 broadcastHistory='off', shoeLibrary=None, roundsPerShoe=None):
         
-        self.broadcast = Broadcast()
-        self.table = Table(self.broadcast, numberOfSeats=numberOfSeats)
+        self.rng = random.Random(seed)
+        self.broadcast = Broadcast(history=broadcastHistory)
+        self.table = Table(self.broadcast, numberOfSeats=numberOfSeats, rng=self.rng,
+                           shoeLibrary=shoeLibrary, roundsPerShoe=roundsPerShoe)
         self.penPosition = penPosition
+        self.profiler = None
+        self.roundKernel = None
+        self.roundLog = None
+        self.replayLog = None
         
         # Penetrate the deck
         if not randomPen:
@@ -55,6 +85,8 @@ class Game(object):
         """
         if seatNo < self.table.numberOfSeats:
             player.broadcast = self.broadcast
+            for name in player.countingSystems:
+                self.broadcast.registerCount(name)
             self.table.seats[seatNo].addPlayer(player)
             
     def removePlayerFromSeat(self, seatNo):
@@ -66,8 +98,8 @@ class Game(object):
         seatNo : int
             Seat number to remove player from (index from 0)
         """
-        if seatNo < self.seats:
-            self.table.seats[seatNo] = Seat()
+        if seatNo < self.table.numberOfSeats:
+            self.table.seats[seatNo] = Seat(self.table.handPool)
         
         
     def play(self, numberOfShoes=1, showHands=False, showBanks=False):
@@ -82,8 +114,10 @@ class Game(object):
         
         for n in range(numberOfShoes):
             
-            while None in self.table.shoe.cards:
+            roundsPlayed = 0
+            while not self.table.shoe.finished(roundsPlayed):
                 self.table.nextRound()
+                roundsPlayed += 1
                 
                 # If wanted, print info
                 if showHands:
@@ -94,6 +128,119 @@ class Game(object):
                     
             # Shoe has ended, start new shoe.
             self.table.newShoe()
+            
+    def enableProfiling(self, trackAllocations=False):
+        """
+        Start accumulating time, calls, cards drawn and (optionally) memory
+        allocated in each phase of every round, and time spent in the
+        decisions of each player class. Seat players before enabling, and
+        enable before a round log or replay log. Profiling cannot be
+        combined with the RoundKernel and raises ValueError if it is enabled.
+        
+        Parameters
+        ----------
+        trackAllocations : bool
+            Also measure memory allocated, with tracemalloc
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+        profiler = RoundProfiler(self.table, trackAllocations)
+        profiler.enable()
+        self.profiler = profiler
+        
+    def disableProfiling(self):
+        """
+        Stop profiling. The totals so far are still available from
+        profileReport.
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+            
+    def profileReport(self):
+        """
+        Profiling totals, see RoundProfiler.report.
+        
+        Returns
+        -------
+        report : dict
+            Totals per phase and per player class, None if profiling has
+            never been enabled
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.report()
+        
+    def enableRoundKernel(self):
+        """
+        Play rounds with the fast RoundKernel instead of Table.nextRound.
+        Every seated player must be table-driven, see PolicyTable.py. Banks
+        are the same as with Table.nextRound.
+        
+        The kernel cannot be combined with profiling, a round log or a
+        replay log, and raises ValueError if any of them is enabled.
+        """
+        if self.roundKernel is None:
+            self.roundKernel = RoundKernel(self.table)
+        self.roundKernel.enable()
+        
+    def disableRoundKernel(self):
+        """
+        Go back to playing rounds with Table.nextRound.
+        """
+        if self.roundKernel is not None:
+            self.roundKernel.disable()
+        
+    def enableRoundLog(self, path, chunkRounds=65536):
+        """
+        Write every round played to a columnar log on disk, see RoundLog.py.
+        Seat players before enabling. Raises ValueError if the RoundKernel
+        is enabled, as it does not fill the hands the log reads.
+        
+        Parameters
+        ----------
+        path : str
+            Directory to write the log to
+        chunkRounds : int
+            Number of rounds buffered in memory between writes
+        """
+        if self.roundKernel is not None and self.roundKernel.enabled:
+            raise ValueError('Rounds cannot be logged while the RoundKernel is enabled')
+        self.disableRoundLog()
+        self.roundLog = RoundLogWriter(self.table, path, chunkRounds)
+        self.roundLog.enable()
+        
+    def disableRoundLog(self):
+        """
+        Stop logging rounds, and write out and close the log.
+        """
+        if self.roundLog is not None:
+            self.roundLog.close()
+            self.roundLog = None
+        
+    def enableReplayLog(self, path):
+        """
+        Record a replay log of the game from now on, see ReplayLog.py. Seat
+        players before enabling. Raises ValueError if the RoundKernel is
+        enabled, as the players' decisions are not asked of them.
+        
+        Parameters
+        ----------
+        path : str
+            File to write the log to
+        """
+        if self.roundKernel is not None and self.roundKernel.enabled:
+            raise ValueError('A replay cannot be recorded while the RoundKernel is enabled')
+        self.disableReplayLog()
+        self.replayLog = ReplayRecorder(self.table, path)
+        self.replayLog.enable()
+        
+    def disableReplayLog(self):
+        """
+        Stop recording the replay log, and close it.
+        """
+        if self.replayLog is not None:
+            self.replayLog.close()
+            self.replayLog = None
         
     ###########################################################################
     #### Useful functions that dont add to setting up the game or gameplay       
@@ -105,7 +252,7 @@ class Game(object):
         """
         dstr = ''
         for n, card in enumerate(self.table.dealer.hand.cards):
-            dstr += '{:3}'.format(card)
+            dstr += '{:3}'.format(cardToString(card))
             if n < len(self.table.dealer.hand.cards)-1:
                 dstr += ' '
         print("Dealer   :   {:2d} [{}]".format(ut.getTotal(self.table.dealer.hand), dstr))        
@@ -113,7 +260,7 @@ class Game(object):
             for h, hand in enumerate(seat.hands):
                 hstr = ''
                 for n, card in enumerate(hand.cards):
-                    hstr += '{:3}'.format(card)
+                    hstr += '{:3}'.format(cardToString(card))
                     if n < len(hand.cards)-1:
                         hstr += ' '
                 print("Seat {}.{} :   {:2d} [{}]".format(s, h, ut.getTotal(hand), hstr))
@@ -122,6 +269,25 @@ class Game(object):
     def showPlayerBanks(self):
         for player in self.table.getPlayers():
             print("{}: bank = {}".format(player.__name__, player.bank))
+            
+    def showProfile(self):
+        """
+        Print the profiling totals.
+        """
+        report = self.profileReport()
+        if report is None:
+            return
+        print("Rounds profiled: {}".format(report['rounds']))
+        for phase, totals in report['phases'].items():
+            line = "{:14s}: {:9.4f} s {:8d} calls {:8d} cards".format(
+                phase, totals['time'], totals['calls'], totals['cards'])
+            if totals['allocated'] is not None:
+                line += " {:12d} bytes".format(totals['allocated'])
+            print(line)
+        for className, decisions in report['players'].items():
+            for decision, totals in decisions.items():
+                print("{:16s} {:18s}: {:9.4f} s {:8d} calls".format(
+                    className, decision, totals['time'], totals['calls']))
                 
                 
     
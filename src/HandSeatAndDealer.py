@@ -5,13 +5,17 @@ Created on Thu Sep 19 18:43:23 2019
 
 @author: ajw1e16
 """
-import utilityFunctions as ut
+from Cards import CARD_VALUE, CARD_HARD_VALUE, CARD_IS_ACE
 
 class Hand(object):
     """
     A single hand, i.e. intially only two cards. Players may have multiple
     hands in a single game.
     
+    The total of the hand and whether it is soft, bust or blackjack are kept
+    up to date as cards are added, so reading them is free. Hands are reused
+    from round to round, see reset.
+    
     Parameters
     ----------
     
@@ -20,21 +24,78 @@ class Hand(object):
         
     """
     
+    __slots__ = ('stuck', 'cards', 'bet', 'hardTotal', 'numberOfAces',
+                 'total', 'soft', 'bust', 'blackjack')
+    
     def __init__(self, bet=None):
-        self.stuck = False
         self.cards = []
+        self.reset(bet)
+        
+    def reset(self, bet=None):
+        """
+        Empty this hand, ready to be played again.
+        
+        Parameters
+        ----------
+        bet : float
+            The size of the bet for the new hand
+        """
+        self.stuck = False
+        self.cards.clear()
         self.bet = bet
         
+        # Total counting all aces as 1, and the number of aces
+        self.hardTotal = 0
+        self.numberOfAces = 0
+        
+        # Derived from the above
+        self.total = 0
+        self.soft = False
+        self.bust = False
+        self.blackjack = False
+        
     def addCard(self, card):
         """
         Add a card to this hand.
         
         Parameters
         ----------
-        card : str
-            String defining the card to add
+        card : int
+            The card to add
         """
         self.cards.append(card)
+        self.hardTotal += CARD_HARD_VALUE[card]
+        self.numberOfAces += CARD_IS_ACE[card]
+        self.updateState()
+        
+    def popCard(self):
+        """
+        Remove the last card from this hand, e.g. when splitting.
+        
+        Returns
+        -------
+        card : int
+            The card removed
+        """
+        card = self.cards.pop()
+        self.hardTotal -= CARD_HARD_VALUE[card]
+        self.numberOfAces -= CARD_IS_ACE[card]
+        self.updateState()
+        return card
+        
+    def updateState(self):
+        """
+        Recompute the total and flags from the hard total and number of aces.
+        At most one ace can count as 11, and only if that does not bust.
+        """
+        if self.numberOfAces and self.hardTotal <= 11:
+            self.total = self.hardTotal + 10
+            self.soft = True
+        else:
+            self.total = self.hardTotal
+            self.soft = False
+        self.bust = self.total > 21
+        self.blackjack = self.total == 21 and len(self.cards) == 2
         
     def doubleDown(self, shoe):
         """
@@ -72,17 +133,29 @@ class Seat(object):
     A physical seat. A seat can have multiple hands/bets, e.g. through 
     splitting, and a player may play on multiple seats. Only one player per 
     seat.
+    
+    Parameters
+    ----------
+    handPool : list
+        Unused Hand objects, shared by the seats at a table. Hands are taken
+        from the pool for new bets and returned to it when the seat is
+        reset. If not given, a new Hand is made for every bet.
     """
     
-    def __init__(self):
+    __slots__ = ('player', 'hands', 'handPool')
+    
+    def __init__(self, handPool=None):
         self.player = None
         self.hands = []
+        self.handPool = handPool
         
     def resetSeat(self):
         """
         Delete the hand at this seat.
         """
-        self.hands = []
+        if self.handPool is not None:
+            self.handPool.extend(self.hands)
+        self.hands.clear()
     
     def newBet(self, bet):
         """
@@ -92,7 +165,12 @@ class Seat(object):
             Bet size of the new bet
         """
         if bet <= self.player.bank and bet > 0:
-            self.hands.append(Hand(bet))
+            if self.handPool:
+                hand = self.handPool.pop()
+                hand.reset(bet)
+            else:
+                hand = Hand(bet)
+            self.hands.append(hand)
             self.player.roundBetting += bet
         
     def addPlayer(self, player):
@@ -116,6 +194,11 @@ class Dealer(object):
     
     """
     
+    # Does the dealer hit soft 17?
+    hitsSoft17 = True
+    
+    __slots__ = ('hand',)
+    
     def __init__(self):
         self.hand = Hand()
     
@@ -125,23 +208,24 @@ class Dealer(object):
         
         Returns
         -------
-        card : str
-            This string defining the dealers up-card
+        card : int
+            The dealers up-card
         """
         return self.hand.cards[0]
     
     def shouldHit(self, hand):
         """
-        Should the dealer be hitting their current hand? Dealer hits soft 17.
+        Should the dealer be hitting their current hand? Dealer hits soft 17
+        if hitsSoft17 is set.
         
         Returns
         -------
         hit : bool
             Should the dealer hit?
         """
-        if ut.getTotal(hand) <= 16:
+        if hand.total <= 16:
             return True
-        elif ut.getTotal(hand) == 17 and ut.isSoft(hand):
+        elif hand.total == 17 and hand.soft and self.hitsSoft17:
             return True
         else:
             return False
@@ -155,7 +239,7 @@ class Dealer(object):
         tot : int
             The value of the dealers up card
         """
-        return ut.getNumber(self.hand.cards[0])
+        return CARD_VALUE[self.hand.cards[0]]
     
     def fullTotal(self):
         """
@@ -166,13 +250,13 @@ class Dealer(object):
         tot : int
             The value of the dealers up card
         """
-        return ut.getTotal(self.hand)
+        return self.hand.total
         
     def resetHand(self):
         """
-        Delete the dealer's hand.
+        Empty the dealer's hand.
         """
-        self.hand = Hand()
+        self.hand.reset()
     
     def playHand(self, hand, shoe):
         """
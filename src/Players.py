@@ -9,6 +9,9 @@ Various blackjack players.
 """
 
 import utilityFunctions as ut
+from Recorders import FullRecorder
+from ExpectedValues import ExpectedValues
+from PolicyTable import PolicyTable
 
 class Player(object):
     """
@@ -20,14 +23,35 @@ class Player(object):
 
     bank : int
         Total money player is bringing to the table.
+    recorder : BankRecorder object
+        Records the player's bank after every round, see Recorders.py.
+        Defaults to keeping the full history.
     """
-    def __init__(self, bank=1000):
 
-        # History of this players bank
-        self.bankHistory = []
+    # Counting systems this player reads from the broadcast
+    countingSystems = ()
+
+    # Does decideBatch decide from the hand states alone, so that one player
+    # of this class can decide for the hands of every player of the class?
+    batchedDecisions = False
+
+    # Do the decision methods this class defines depend only on the hand and
+    # the dealer's up-card, so they can be tabulated? See
+    # PolicyTable.isTableDriven.
+    tableDriven = False
+
+    # The attributes the table uses every round are slots. Subclasses do not
+    # declare slots, so they are free to add attributes of their own.
+    __slots__ = ('recorder', 'bank', 'roundBetting', 'payout', 'broadcast')
+
+    def __init__(self, bank=1000, recorder=None):
+
+        # Records the history of this players bank
+        self.recorder = recorder if recorder is not None else FullRecorder()
 
         # Current bank
         self.bank = bank
+        self.recorder.record(bank)
 
         # How much have we bet in this round
         self.roundBetting = 0
@@ -40,46 +64,18 @@ class Player(object):
 
 
     @property
-    def bank(self):
-        return self.__bank
-
-    @bank.setter
-    def bank(self, bank):
+    def bankHistory(self):
         """
-        Update the player's bank. When setting the player's bank at the end of
-        a round, update the players bank history also.
-
-        Parameters
-        ----------
-        bank : float
-            The new bank
+        The bank history kept by this player's recorder.
         """
-        self.__bank = bank
-
-        # Save to the history
-        self.bankHistory.append(self.bank)
-
-    @property
-    def roundBetting(self):
-        return self.__roundBetting
-
-    @roundBetting.setter
-    def roundBetting(self, amount):
-        self.__roundBetting = amount
-
-    @property
-    def payout(self):
-        return self.__payout
-
-    @payout.setter
-    def payout(self, amount):
-        self.__payout = amount
+        return self.recorder.history()
 
     def settleRound(self):
         """
         After a round has ended, settle up outstanding bets.
         """
         self.bank += self.payout - self.roundBetting
+        self.recorder.record(self.bank)
         self.payout = 0
         self.roundBetting = 0
 
@@ -108,6 +104,22 @@ class Player(object):
         """
         raise NotImplementedError('Need to implement getBet for this player: ', self.__class__)
 
+    def decideBatch(self, batch):
+        """
+        Decide many hands at once, used by BatchedPlay. Given a
+        DecisionBatch (see Decisions.py), return an array with one action
+        for each hand, chosen from the actions allowed for it.
+        """
+        raise NotImplementedError('Need to implement decideBatch for this player: ', self.__class__)
+
+    def getBets(self, trueCounts):
+        """
+        Vectorised getBet, used by BatchGame. Given a NumPy array of true
+        Hi-Lo counts, one per game, what size bet does this player make in
+        each game? A single number means the same bet in every game.
+        """
+        raise NotImplementedError('Need to implement getBets for this player: ', self.__class__)
+
 
 class Mug(Player):
     """
@@ -116,6 +128,8 @@ class Mug(Player):
 
     __name__ = 'Mug'
 
+    tableDriven = True
+
     def wantsToHit(self, hand):
         return True
 
@@ -128,6 +142,9 @@ class Mug(Player):
     def getBet(self):
         return 80
 
+    def getBets(self, trueCounts):
+        return 80
+
 
 class Sticker(Player):
     """
@@ -136,6 +153,8 @@ class Sticker(Player):
 
     __name__ = 'Pussy'
 
+    tableDriven = True
+
     def wantsToSplit(self, hand):
         return False
 
@@ -148,6 +167,9 @@ class Sticker(Player):
     def getBet(self):
         return 80
 
+    def getBets(self, trueCounts):
+        return 80
+
 
 class Risker(Player):
     """
@@ -156,6 +178,8 @@ class Risker(Player):
 
     __name__ = 'Risker'
 
+    tableDriven = True
+
     def wantsToHit(self, hand):
         if hand.total < 19:
             return True
@@ -165,13 +189,16 @@ class Risker(Player):
         return True
 
     def wantsToDoubleDown(self, hand):
-        if hand.tot < 12:
+        if hand.total < 12:
             return True
         return False
 
     def getBet(self):
         return 80
 
+    def getBets(self, trueCounts):
+        return 80
+
 
 class BasicStrategist(Player):
     """
@@ -180,6 +207,29 @@ class BasicStrategist(Player):
 
     __name__ = "BasicStrategist"
 
+    tableDriven = True
+    policyTable = None
+
+    @property
+    def batchedDecisions(self):
+        # Decisions come from a PolicyTable of basic strategy, which only
+        # holds while the player still plays BasicStrategist's decisions. A
+        # subclass that overrides any of them, or a player whose methods
+        # have been wrapped (e.g. by a profiler), is asked hand by hand.
+        cls = type(self)
+        instance = vars(self)
+        return (cls.wantsToSplit is BasicStrategist.wantsToSplit
+                and cls.wantsToDoubleDown is BasicStrategist.wantsToDoubleDown
+                and cls.wantsToHit is BasicStrategist.wantsToHit
+                and 'wantsToSplit' not in instance
+                and 'wantsToDoubleDown' not in instance
+                and 'wantsToHit' not in instance)
+
+    def decideBatch(self, batch):
+        if self.policyTable is None:
+            self.policyTable = PolicyTable(self)
+        return self.policyTable.decideBatch(batch)
+
     def wantsToSplit(self, hand):
 
         dealersTot = self.broadcast.dealersTotal
@@ -268,37 +318,105 @@ class BasicStrategist(Player):
     def getBet(self):
         return 80
 
+    def getBets(self, trueCounts):
+        return 80
+
 
 class Counter(BasicStrategist):
+    """
+    Play basic strategy and bet more when the true count is high. Counts
+    with Hi-Lo unless another system from CountingSystems.py is given.
+
+    The bet ramp is (trueCount - threshold) * mult * unit, never less than
+    unit and, if maxBet is given, never more than maxBet.
+
+    Parameters
+    ----------
+    mult : float
+        Units bet per point of true count above the threshold
+    system : str
+        Counting system to use
+    threshold : float
+        True count at which the bet starts to rise
+    unit : float
+        Base (and minimum) bet
+    maxBet : float
+        Largest bet, no limit if not given
+    """
 
     __name__ = "Counter"
 
-    def __init__(self, bank=1000, mult=7):
-        super().__init__(bank)
+    def __init__(self, bank=1000, mult=7, recorder=None, system='HiLo',
+                 threshold=2, unit=80, maxBet=None):
+        super().__init__(bank, recorder)
         self.mult = mult
+        self.system = system
+        self.countingSystems = (system,)
+        self.threshold = threshold
+        self.unit = unit
+        self.maxBet = maxBet
 
     def getBet(self):
-        return max((self.broadcast.trueHiLoCount() - 2) * self.mult * 80, 80)
-
-
-
-
-
-
-
-
-
-
-
+        bet = max((self.broadcast.trueCount(self.system) - self.threshold) * self.mult * self.unit,
+                  self.unit)
+        if self.maxBet is not None:
+            bet = min(bet, self.maxBet)
+        return bet
 
+    def getBets(self, trueCounts):
+        if self.system != 'HiLo':
+            raise NotImplementedError('BatchGame only provides Hi-Lo counts')
+        return ((trueCounts - self.threshold) * self.mult * self.unit).clip(self.unit, self.maxBet)
 
 
+class Oracle(Player):
+    """
+    Play every decision by its expected value, given the dealer's up-card
+    and what is left in the shoe (see ExpectedValues.py). Bets flat. With
+    exact expected values, an upper bound on how well any playing strategy
+    can do, to measure BasicStrategist and Counter against.
 
+    The composition is the one the dealer's hole card was drawn from: the
+    rest of the shoe as the players see it, with the face-down hole card
+    counted as still in it (see Broadcast.playerCompositionKey).
 
+    Parameters
+    ----------
+    expectedValues : ExpectedValues object
+        Shared expected value engine and transposition table. If not given,
+        a new one with exact=False is made, which plays a shoe in a fraction
+        of a second. Pass ExpectedValues() for exact values, at several
+        seconds per shoe for a single player.
+    """
 
+    __name__ = "Oracle"
 
+    def __init__(self, bank=1000, recorder=None, expectedValues=None):
+        super().__init__(bank, recorder)
+        if expectedValues is None:
+            expectedValues = ExpectedValues(exact=False)
+        self.expectedValues = expectedValues
 
+    def actionValues(self, hand):
+        """
+        Expected values of standing, hitting, doubling and splitting this
+        hand, None where an action is not available.
+        """
+        pairValue = ut.getNumber(hand.cards[0]) if ut.canSplit(hand) else None
+        return self.expectedValues.actions(hand, self.broadcast.dealersTotal,
+                                           self.broadcast.playerCompositionKey(), pairValue)
 
+    def wantsToSplit(self, hand):
+        stand, hit, double, split = self.actionValues(hand)
+        return split > max(stand, hit, double)
 
+    def wantsToDoubleDown(self, hand):
+        stand, hit, double, split = self.actionValues(hand)
+        return double > max(stand, hit)
 
+    def wantsToHit(self, hand):
+        stand, hit, double, split = self.actionValues(hand)
+        return hit > stand
 
+    def getBet(self):
+        return 80
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lookup-table form of a player's playing decisions.
+
+Many players (e.g. BasicStrategist and Counter) decide whether to hit,
+double or split using only the total of their hand, whether it is soft, the
+pair they hold and the dealer's up-card. For those players every decision
+can be worked out once, up front, by asking the player about a
+representative hand for each state. Fast engines then look decisions up
+instead of calling the player.
+"""
+
+import numpy as np
+
+from Broadcast import Broadcast
+from Decisions import STAND, HIT, DOUBLE, SPLIT, ALLOW_HIT, ALLOW_DOUBLE, ALLOW_SPLIT
+from HandSeatAndDealer import Hand
+from Cards import encodeCard, RANK_VALUES
+
+# Table dimensions. Totals and values are used as indices directly.
+NUMBER_OF_TOTALS = 22
+NUMBER_OF_UPCARDS = 12
+
+# Range of dealer up-card values (aces are 11)
+UPCARD_VALUES = range(2, 12)
+
+# The player methods tabulated
+DECISION_METHODS = ('wantsToSplit', 'wantsToDoubleDown', 'wantsToHit')
+
+
+def isTableDriven(player):
+    """
+    Can a player's decisions be tabulated? Each decision method must come
+    from a class that itself declares tableDriven = True, so a subclass that
+    overrides a decision must declare it again, and none may be replaced on
+    the player itself.
+
+    Parameters
+    ----------
+    player : Player object
+        The player
+
+    Returns
+    -------
+    tableDriven : bool
+        Do the player's decisions depend only on the hand and the dealer's
+        up-card?
+    """
+    instance = getattr(player, '__dict__', {})
+    for name in DECISION_METHODS:
+        if name in instance:
+            return False
+        for cls in type(player).__mro__:
+            if name in vars(cls):
+                if not vars(cls).get('tableDriven', False):
+                    return False
+                break
+    return True
+
+
+def rankOfValue(value):
+    """
+    A rank with the given blackjack value (aces are 11, tens are tens).
+
+    Parameters
+    ----------
+    value : int
+        Card value, 2 to 11
+
+    Returns
+    -------
+    rank : int
+        Rank index with this value
+    """
+    return RANK_VALUES.index(value)
+
+
+def handOf(*values):
+    """
+    Build a hand holding cards with the given values.
+
+    Parameters
+    ----------
+    values : int
+        Card values, 2 to 11
+
+    Returns
+    -------
+    hand : Hand object
+        The hand
+    """
+    hand = Hand()
+    for suit, value in enumerate(values):
+        hand.addCard(encodeCard(rankOfValue(value), suit % 4))
+    return hand
+
+
+def representativeHand(total, soft):
+    """
+    A two card hand with the given total and softness.
+
+    Parameters
+    ----------
+    total : int
+        Total of the hand, 4 to 20 if hard, 12 to 21 if soft
+    soft : bool
+        Is the hand soft?
+
+    Returns
+    -------
+    hand : Hand object
+        The hand
+    """
+    if soft:
+        if total == 12:
+            return handOf(11, 11)
+        return handOf(11, total - 11)
+    first = min(10, total - 2)
+    return handOf(first, total - first)
+
+
+class PolicyTable(object):
+    """
+    A player's hit, double and split decisions as lookup tables. Entries are
+    indexed as
+
+        hit[soft][total][upCard]
+        double[soft][total][upCard]
+        split[pairValue][upCard]
+
+    where soft is 0 or 1, totals and values are used directly as indices and
+    upCard is the dealer's up-card value (aces are 11). States that can never
+    be asked about are False.
+
+    Parameters
+    ----------
+    player : Player object
+        The player whose decisions to tabulate. Its decisions must depend
+        only on the hand's total, softness and pair, and the dealer's up-card
+        (see isTableDriven).
+    """
+
+    def __init__(self, player):
+        self.hit = self.emptyTable()
+        self.double = self.emptyTable()
+        self.split = [[False] * NUMBER_OF_UPCARDS
+                      for value in range(NUMBER_OF_UPCARDS)]
+
+        # Show the player a private broadcast while we ask it questions
+        originalBroadcast = player.broadcast
+        player.broadcast = Broadcast()
+        try:
+            for upCard in UPCARD_VALUES:
+                player.broadcast.dealersTotal = upCard
+                for soft, totals in ((0, range(4, 21)), (1, range(12, 22))):
+                    for total in totals:
+                        hand = representativeHand(total, soft)
+                        if total < 21:
+                            self.hit[soft][total][upCard] = bool(player.wantsToHit(hand))
+                        self.double[soft][total][upCard] = bool(player.wantsToDoubleDown(hand))
+                for value in UPCARD_VALUES:
+                    hand = handOf(value, value)
+                    self.split[value][upCard] = bool(player.wantsToSplit(hand))
+        finally:
+            player.broadcast = originalBroadcast
+        self.arrays = None
+
+    def decideBatch(self, batch):
+        """
+        Look up the actions for a batch of hands.
+
+        Parameters
+        ----------
+        batch : DecisionBatch
+            The hands to decide
+
+        Returns
+        -------
+        actions : array of int
+            Action for each hand, see Decisions.py
+        """
+        if self.arrays is None:
+            self.arrays = (np.array(self.hit, dtype=bool), np.array(self.double, dtype=bool),
+                           np.array(self.split, dtype=bool))
+        hit, double, split = self.arrays
+        soft, totals, upCards = batch.soft, np.minimum(batch.totals, 21), batch.upCards
+
+        actions = np.full(len(batch), STAND, dtype=np.int64)
+        actions[((batch.allowed & ALLOW_HIT) != 0) & hit[soft, totals, upCards]] = HIT
+        actions[((batch.allowed & ALLOW_DOUBLE) != 0) & double[soft, totals, upCards]] = DOUBLE
+        actions[((batch.allowed & ALLOW_SPLIT) != 0) & split[batch.pairValues, upCards]] = SPLIT
+        return actions
+
+    @staticmethod
+    def emptyTable():
+        return [[[False] * NUMBER_OF_UPCARDS for total in range(NUMBER_OF_TOTALS)]
+                for soft in range(2)]
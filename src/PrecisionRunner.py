@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Play until the expected value is known well enough.
+
+Rather than fixing the number of shoes in advance, runToPrecision plays
+round after round, keeping running statistics of each player's return per
+round and return per unit bet, and stops as soon as every player's
+standard error is below a target (or a time or round budget runs out). It
+reports the precision achieved and how many rounds it took.
+
+Standard errors treat rounds as independent. For players whose bets follow
+the count, neighbouring rounds are slightly correlated and the true error
+is a little larger.
+"""
+
+from time import perf_counter
+
+from Game import Game
+from Statistics import RunningStats
+
+# What the target standard error applies to
+PER_ROUND = 'round'
+PER_UNIT = 'unit'
+
+
+class PrecisionResult(object):
+    """
+    Result of a run to precision.
+
+    Attributes
+    ----------
+    rows : list of dict
+        For each player: 'name', 'rounds' played with a bet, 'ev' and
+        'evStandardError' (return per round), 'variance' (of the return per
+        round), 'unitEv' and 'unitStandardError' (return per unit bet)
+    rounds : int
+        Number of rounds played
+    elapsed : float
+        Wall-clock time taken (s)
+    reason : str
+        Why the run stopped: 'precision', 'time', 'rounds' or 'no bets'
+        (no player short of the target was still betting)
+    """
+
+    def __init__(self, rows, rounds, elapsed, reason):
+        self.rows = rows
+        self.rounds = rounds
+        self.elapsed = elapsed
+        self.reason = reason
+
+    def summary(self):
+        """
+        A printable table of the results.
+
+        Returns
+        -------
+        summary : str
+            One line per player, then how the run ended
+        """
+        lines = []
+        for row in self.rows:
+            lines.append("{:20s}: EV/round = {:10.4f} +/- {:.4f}, EV/unit = {:8.5f} +/- {:.5f}, "
+                         "variance = {:.1f}".format(row['name'], row['ev'], row['evStandardError'],
+                                                    row['unitEv'], row['unitStandardError'],
+                                                    row['variance']))
+        lines.append("{} rounds in {:.1f} s, stopped on {}".format(self.rounds, self.elapsed,
+                                                                   self.reason))
+        return '\n'.join(lines)
+
+
+def runToPrecision(players, targetStandardError, measure=PER_ROUND, timeBudget=None,
+                   maxRounds=10**7, checkEvery=100, seats=None, seed=None, roundsPerShoe=None):
+    """
+    Play a game until every player's expected value is known to a target
+    standard error. Play also stops when a budget runs out, or when none of
+    the players short of the target has bet for checkEvery rounds (e.g.
+    they have gone broke), as the target can then never be met.
+
+    Parameters
+    ----------
+    players : list of Player objects
+        The players to seat
+    targetStandardError : float
+        Stop once every player's standard error is at most this
+    measure : str
+        What the target applies to: 'round', the return per round, or
+        'unit', the return per unit bet
+    timeBudget : float
+        Stop after this many seconds, whatever the precision
+    maxRounds : int
+        Stop after this many rounds, whatever the precision. At least one of
+        timeBudget and maxRounds must be given.
+    checkEvery : int
+        Number of rounds between checks of the stopping rules
+    seats : list of int
+        Seat of each player, defaults to seats 1, 2, ...
+    seed : int
+        Seed for the game
+    roundsPerShoe : int
+        If given, play with an infinite deck, see InfiniteShoe. The fastest
+        way to a tight estimate for players that do not count.
+
+    Returns
+    -------
+    result : PrecisionResult
+        Estimates, precision achieved and rounds used
+    """
+    if measure not in (PER_ROUND, PER_UNIT):
+        raise ValueError('Unknown measure: ', measure)
+    if timeBudget is None and maxRounds is None:
+        raise ValueError('Give a timeBudget or maxRounds, the target may never be met')
+    if seats is None:
+        seats = list(range(1, len(players) + 1))
+
+    game = Game(seed=seed, roundsPerShoe=roundsPerShoe)
+    for player, seatNo in zip(players, seats):
+        game.addPlayerToSeat(player, seatNo)
+    table = game.table
+
+    roundStats = [RunningStats() for player in players]
+    unitStats = [RunningStats() for player in players]
+    chosen = roundStats if measure == PER_ROUND else unitStats
+    banks = [player.bank for player in players]
+    # Whether each player has bet since the last check
+    betSinceCheck = [False] * len(players)
+    rounds = 0
+    roundsThisShoe = 0
+    start = perf_counter()
+
+    while True:
+        if table.shoe.finished(roundsThisShoe):
+            table.newShoe()
+            roundsThisShoe = 0
+        table.nextRound()
+        rounds += 1
+        roundsThisShoe += 1
+
+        # The seats' hands, with any doubled bets, stay on the table until
+        # the next round
+        for i, player in enumerate(players):
+            result = player.bank - banks[i]
+            banks[i] = player.bank
+            bet = 0
+            for seat in table.seats:
+                if seat.player is player:
+                    for hand in seat.hands:
+                        bet += hand.bet
+            if bet:
+                roundStats[i].push(result)
+                unitStats[i].push(result / bet)
+                betSinceCheck[i] = True
+
+        if rounds % checkEvery == 0:
+            if all(stats.standardError() <= targetStandardError for stats in chosen):
+                reason = 'precision'
+                break
+            if timeBudget is not None and perf_counter() - start >= timeBudget:
+                reason = 'time'
+                break
+            if not any(betSinceCheck[i] for i, stats in enumerate(chosen)
+                       if stats.standardError() > targetStandardError):
+                reason = 'no bets'
+                break
+            betSinceCheck = [False] * len(players)
+        if maxRounds is not None and rounds >= maxRounds:
+            reason = 'rounds'
+            break
+
+    rows = []
+    for i, player in enumerate(players):
+        rows.append({'name': player.__name__,
+                     'rounds': roundStats[i].count,
+                     'ev': roundStats[i].mean,
+                     'evStandardError': roundStats[i].standardError(),
+                     'variance': roundStats[i].variance(),
+                     'unitEv': unitStats[i].mean,
+                     'unitStandardError': unitStats[i].standardError()})
+    return PrecisionResult(rows, rounds, perf_counter() - start, reason)
+
+
+if __name__ == '__main__':
+
+    from Players import BasicStrategist, Counter
+
+    result = runToPrecision([BasicStrategist(10**9), Counter(10**9)], targetStandardError=0.005,
+                            measure=PER_UNIT, timeBudget=60, seed=1)
+    print(result.summary())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in profiling of Table.nextRound.
+
+Enabling a RoundProfiler replaces a table's nextRound with an instrumented
+copy that times each phase of the round, and wraps the decision methods of
+the seated players. Disabling it removes both again, so a table that is not
+being profiled runs exactly the normal code.
+
+The instrumented copy plays the round itself, so a profiler must be enabled
+before any other round hook (see Table.installRound) and cannot be used
+with a RoundKernel. A RoundLogWriter or ReplayRecorder may be enabled over
+it.
+"""
+
+import tracemalloc
+from time import perf_counter
+
+# The phases of Table.nextRound, in order
+PHASES = ('cleanSeats', 'getBets', 'deal', 'playerActions', 'dealerAction', 'settleUp')
+
+# Player methods the table calls
+DECISIONS = ('getBet', 'wantsToSplit', 'wantsToDoubleDown', 'wantsToHit')
+
+
+class RoundProfiler(object):
+    """
+    Accumulates wall time, call counts, cards drawn and, optionally, bytes
+    allocated for every phase of Table.nextRound, and time spent in each
+    player class's decisions.
+
+    Parameters
+    ----------
+    table : Table object
+        The table to profile
+    trackAllocations : bool
+        Measure the memory allocated in each phase with tracemalloc. This
+        slows play down considerably.
+    """
+
+    def __init__(self, table, trackAllocations=False):
+        self.table = table
+        self.trackAllocations = trackAllocations
+        self.enabled = False
+        self.startedTracing = False
+        # (player, name, attribute before wrapping, wrapper) for every
+        # player method wrapped
+        self.wrapped = []
+        self.reset()
+
+    def reset(self):
+        """
+        Zero all totals.
+        """
+        self.rounds = 0
+        self.time = dict.fromkeys(PHASES, 0.)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.cards = dict.fromkeys(PHASES, 0)
+        self.allocated = dict.fromkeys(PHASES, 0)
+        self.playerTime = {}
+        self.playerCalls = {}
+
+    def enable(self):
+        """
+        Start profiling. Players seated after this are not profiled
+        individually.
+        """
+        if self.enabled:
+            return
+        # The profiler plays the round's phases itself, so it would skip a
+        # RoundKernel or a log installed before it
+        if self.table.roundHooks:
+            raise ValueError('RoundProfiler cannot be enabled over other round hooks: ', self.table.roundHooks)
+        self.enabled = True
+        if self.trackAllocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.startedTracing = True
+        self.table.installRound(self.nextRound)
+        for player in self.table.getPlayers():
+            self.wrapPlayer(player)
+
+    def disable(self):
+        """
+        Stop profiling and put the table and players back as they were.
+        """
+        if not self.enabled:
+            return
+        self.table.removeRound(self.nextRound)
+        self.enabled = False
+        for player, name, previous, wrapper in reversed(self.wrapped):
+            # Leave anything wrapped over the profiler alone
+            if vars(player).get(name) is not wrapper:
+                continue
+            if previous is None:
+                delattr(player, name)
+            else:
+                setattr(player, name, previous)
+        self.wrapped = []
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+
+    def wrapPlayer(self, player):
+        """
+        Time a player's decisions, totalled by player class.
+        """
+        className = type(player).__name__
+        playerTime = self.playerTime.setdefault(className, dict.fromkeys(DECISIONS, 0.))
+        playerCalls = self.playerCalls.setdefault(className, dict.fromkeys(DECISIONS, 0))
+        for decision in DECISIONS:
+            method = getattr(player, decision)
+
+            def timed(*args, method=method, decision=decision):
+                start = perf_counter()
+                result = method(*args)
+                playerTime[decision] += perf_counter() - start
+                playerCalls[decision] += 1
+                return result
+            self.wrapped.append((player, decision, vars(player).get(decision), timed))
+            setattr(player, decision, timed)
+
+    def nextRound(self):
+        """
+        Instrumented copy of Table.nextRound.
+        """
+        table = self.table
+        for phase in PHASES:
+            method = getattr(table, phase)
+            position = table.shoe.position
+            if self.trackAllocations:
+                memory = tracemalloc.get_traced_memory()[0]
+            start = perf_counter()
+            method()
+            self.time[phase] += perf_counter() - start
+            if self.trackAllocations:
+                self.allocated[phase] += tracemalloc.get_traced_memory()[0] - memory
+            self.cards[phase] += table.shoe.position - position
+            self.calls[phase] += 1
+        self.rounds += 1
+
+    def report(self):
+        """
+        Totals so far.
+
+        Returns
+        -------
+        report : dict
+            'rounds', the number of rounds profiled; 'phases', for each phase
+            its 'time' (s), 'calls', 'cards' drawn and net bytes 'allocated'
+            (None unless tracking allocations); 'players', for each player
+            class and decision its 'time' (s) and 'calls'.
+        """
+        phases = {}
+        for phase in PHASES:
+            phases[phase] = {
+                'time': self.time[phase],
+                'calls': self.calls[phase],
+                'cards': self.cards[phase],
+                'allocated': self.allocated[phase] if self.trackAllocations else None,
+            }
+        players = {}
+        for className, times in self.playerTime.items():
+            players[className] = {decision: {'time': times[decision],
+                                             'calls': self.playerCalls[className][decision]}
+                                  for decision in DECISIONS}
+        return {'rounds': self.rounds, 'phases': phases, 'players': players}
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bank history recorders.
+
+Every player has a recorder, which is handed the player's bank at the start
+and after every round. Choosing a recorder chooses how much memory a long
+run uses: the full history, a downsampled one, only the most recent rounds,
+or just summary statistics.
+"""
+
+from array import array
+
+
+class BankRecorder(object):
+    """
+    Base recorder. All other recorders inherit from this.
+    """
+
+    def record(self, bank):
+        """
+        Record the player's bank. Called with the starting bank and then after
+        every round.
+
+        Parameters
+        ----------
+        bank : float
+            The player's bank
+        """
+        raise NotImplementedError('Need to implement record for this recorder: ', self.__class__)
+
+    def newShoe(self):
+        """
+        Called by the table when a shoe ends and a new one starts.
+        """
+        pass
+
+    def history(self):
+        """
+        The recorded banks, oldest first.
+
+        Returns
+        -------
+        history : array of float
+            Recorded banks
+        """
+        raise NotImplementedError('Need to implement history for this recorder: ', self.__class__)
+
+
+class FullRecorder(BankRecorder):
+    """
+    Record the bank after every round, as a compact array of doubles.
+    """
+
+    def __init__(self):
+        self.banks = array('d')
+
+    def record(self, bank):
+        self.banks.append(bank)
+
+    def history(self):
+        return self.banks
+
+
+class DownsampledRecorder(BankRecorder):
+    """
+    Record the starting bank and then the bank after every Nth round.
+
+    Parameters
+    ----------
+    every : int
+        Record once every this many rounds
+    """
+
+    def __init__(self, every=100):
+        self.every = every
+        self.banks = array('d')
+        self.numberOfRecords = 0
+
+    def record(self, bank):
+        if self.numberOfRecords % self.every == 0:
+            self.banks.append(bank)
+        self.numberOfRecords += 1
+
+    def history(self):
+        return self.banks
+
+
+class PerShoeRecorder(BankRecorder):
+    """
+    Record the starting bank and then the bank at the end of every shoe.
+    """
+
+    def __init__(self):
+        self.banks = array('d')
+        self.lastBank = None
+        self.roundsThisShoe = 0
+
+    def record(self, bank):
+        if self.lastBank is None:
+            self.banks.append(bank)
+        else:
+            self.roundsThisShoe += 1
+        self.lastBank = bank
+
+    def newShoe(self):
+        if self.roundsThisShoe:
+            self.banks.append(self.lastBank)
+            self.roundsThisShoe = 0
+
+    def history(self):
+        return self.banks
+
+
+class RingRecorder(BankRecorder):
+    """
+    Keep only the most recent banks in a fixed size ring buffer.
+
+    Parameters
+    ----------
+    size : int
+        Number of banks to keep
+    """
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.banks = array('d', bytes(8 * size))
+        self.numberOfRecords = 0
+
+    def record(self, bank):
+        self.banks[self.numberOfRecords % self.size] = bank
+        self.numberOfRecords += 1
+
+    def history(self):
+        if self.numberOfRecords <= self.size:
+            return self.banks[:self.numberOfRecords]
+        start = self.numberOfRecords % self.size
+        return self.banks[start:] + self.banks[:start]
+
+
+class SummaryRecorder(BankRecorder):
+    """
+    Keep no history, only running statistics of the bank: minimum, maximum,
+    mean and the largest drawdown from a previous peak.
+    """
+
+    def __init__(self):
+        self.numberOfRecords = 0
+        self.lastBank = None
+        self.minimum = float('inf')
+        self.maximum = -float('inf')
+        self.mean = 0.
+        self.maxDrawdown = 0.
+
+    def record(self, bank):
+        self.numberOfRecords += 1
+        self.lastBank = bank
+        self.mean += (bank - self.mean) / self.numberOfRecords
+        if bank < self.minimum:
+            self.minimum = bank
+        if bank > self.maximum:
+            self.maximum = bank
+        elif self.maximum - bank > self.maxDrawdown:
+            self.maxDrawdown = self.maximum - bank
+
+    def history(self):
+        return array('d')
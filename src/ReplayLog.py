@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact binary replay log.
+
+A ReplayRecorder writes everything needed to replay a game exactly: the
+order of every shoe, where it was cut, the players' banks at the start of
+each shoe and every answer each player gave the table (bets, splits,
+doubles and hits). ReplayLog reads it back. To reconstruct a round it seeks
+straight to the start of that round's shoe and replays the shoe up to the
+round on a real table, with scripted players that give the recorded answers
+rather than running any player logic.
+
+The file is a sequence of records, each a one byte type and a four byte
+length followed by the payload:
+
+    H   header: JSON with the number of seats, the seat of each player and
+        the players' names
+    S   shoe: cut position (uint16), number of cards already dealt when
+        recording of the shoe started (uint16), number of cards (uint16),
+        the cards (uint8 each), then each player's bank (float64)
+    R   round: for each player, the number of bets (uint8), the bets
+        (float64 each), the number of decisions (uint16) and one byte per
+        decision, (decision code << 1) | answer
+"""
+
+import json
+import struct
+
+from DeckAndShoe import Shoe
+from Players import Player
+from RoundKernel import RoundKernel
+
+MAGIC = b'BJRP\x02'
+
+RECORD = struct.Struct('<cI')
+
+# Decision codes
+SPLIT = 0
+DOUBLE = 1
+HIT = 2
+
+DECISION_CODES = {'wantsToSplit': SPLIT, 'wantsToDoubleDown': DOUBLE, 'wantsToHit': HIT}
+
+
+class ReplayRecorder(object):
+    """
+    Records a table's play to a replay log. Enabling the recorder wraps the
+    table's nextRound (whichever is in use) and the seated players' methods,
+    disabling it puts them back.
+
+    The players' decisions are recorded as the table asks for them, so the
+    table must be played with Table.nextRound; enabling the recorder on a
+    table played by a RoundKernel raises ValueError. The
+    shoe order is recorded too, so the table must deal from a finite Shoe.
+
+    Parameters
+    ----------
+    table : Table object
+        The table to record. Seat players before enabling.
+    path : str
+        File to write the log to
+    """
+
+    def __init__(self, table, path):
+        if not isinstance(table.shoe, Shoe):
+            raise ValueError('ReplayRecorder needs a finite Shoe, got: ', type(table.shoe))
+        self.table = table
+        self.path = path
+        self.enabled = False
+        self.players = table.getPlayers()
+        self.bets = [[] for player in self.players]
+        self.decisions = [bytearray() for player in self.players]
+        self.shoePosition = None
+        # (player, name, attribute before wrapping, wrapper) for every
+        # player method wrapped
+        self.wrapped = []
+
+        seats = [self.players.index(seat.player) if seat.player is not None else None
+                 for seat in table.seats]
+        header = {'numberOfSeats': table.numberOfSeats, 'seats': seats,
+                  'players': [player.__name__ for player in self.players]}
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.writeRecord(b'H', json.dumps(header).encode())
+
+    def writeRecord(self, recordType, payload):
+        self.file.write(RECORD.pack(recordType, len(payload)))
+        self.file.write(payload)
+
+    def enable(self):
+        """
+        Start recording.
+        """
+        if self.enabled:
+            return
+        if any(isinstance(getattr(hook, '__self__', None), RoundKernel)
+               for hook in self.table.roundHooks):
+            raise ValueError('ReplayRecorder cannot be used with a RoundKernel')
+        self.enabled = True
+        self.playRound = self.table.installRound(self.nextRound)
+        for p, player in enumerate(self.players):
+            self.wrapPlayer(p, player)
+
+    def disable(self):
+        """
+        Stop recording, and put the table and players back as they were.
+        """
+        if not self.enabled:
+            return
+        self.table.removeRound(self.nextRound)
+        self.enabled = False
+        for player, name, previous, wrapper in reversed(self.wrapped):
+            # Leave anything wrapped over this recorder alone
+            if vars(player).get(name) is not wrapper:
+                continue
+            if previous is None:
+                delattr(player, name)
+            else:
+                setattr(player, name, previous)
+        self.wrapped = []
+        self.file.flush()
+
+    def wrapPlayer(self, p, player):
+        """
+        Record a player's answers to the table.
+        """
+        bets = self.bets[p]
+        decisions = self.decisions[p]
+        getBet = player.getBet
+
+        def recordedBet():
+            bet = getBet()
+            bets.append(bet)
+            return bet
+        self.wrapped.append((player, 'getBet', vars(player).get('getBet'), recordedBet))
+        player.getBet = recordedBet
+
+        for decision, code in DECISION_CODES.items():
+            method = getattr(player, decision)
+
+            def recorded(hand, method=method, code=code):
+                answer = bool(method(hand))
+                decisions.append(code << 1 | answer)
+                return answer
+            self.wrapped.append((player, decision, vars(player).get(decision), recorded))
+            setattr(player, decision, recorded)
+
+    def nextRound(self):
+        """
+        Play the next round and record it.
+        """
+        shoe = self.table.shoe
+        if self.shoePosition is None or shoe.position < self.shoePosition:
+            payload = (struct.pack('<HHH', shoe.penPosition, shoe.position, len(shoe.cards))
+                       + bytes(shoe.cards)
+                       + struct.pack('<{}d'.format(len(self.players)),
+                                     *[player.bank for player in self.players]))
+            self.writeRecord(b'S', payload)
+
+        self.playRound()
+        self.shoePosition = shoe.position
+
+        payload = bytearray()
+        for bets, decisions in zip(self.bets, self.decisions):
+            payload += struct.pack('<B{}d'.format(len(bets)), len(bets), *bets)
+            payload += struct.pack('<H', len(decisions))
+            payload += decisions
+            bets.clear()
+            decisions.clear()
+        self.writeRecord(b'R', payload)
+
+    def close(self):
+        """
+        Stop recording and close the file.
+        """
+        self.disable()
+        self.file.close()
+
+
+class ScriptedPlayer(Player):
+    """
+    A player that gives the table recorded answers, in order.
+
+    Parameters
+    ----------
+    name : str
+        Name of the player recorded
+    bank : float
+        Starting bank
+    """
+
+    def __init__(self, name, bank):
+        super().__init__(bank)
+        self.__name__ = name
+        self.bets = []
+        self.decisions = b''
+        self.nextBet = 0
+        self.nextDecision = 0
+
+    def script(self, bets, decisions):
+        """
+        Give the player the answers for the next round.
+        """
+        self.bets = bets
+        self.decisions = decisions
+        self.nextBet = 0
+        self.nextDecision = 0
+
+    def getBet(self):
+        bet = self.bets[self.nextBet]
+        self.nextBet += 1
+        return bet
+
+    def answer(self, code):
+        decision = self.decisions[self.nextDecision]
+        self.nextDecision += 1
+        if decision >> 1 != code:
+            raise ValueError('Replay out of step with the log')
+        return bool(decision & 1)
+
+    def wantsToSplit(self, hand):
+        return self.answer(SPLIT)
+
+    def wantsToDoubleDown(self, hand):
+        return self.answer(DOUBLE)
+
+    def wantsToHit(self, hand):
+        return self.answer(HIT)
+
+
+class ReplayLog(object):
+    """
+    Reads a replay log, indexing where every shoe starts.
+
+    Parameters
+    ----------
+    path : str
+        Log written by a ReplayRecorder
+
+    Attributes
+    ----------
+    players : list of str
+        Names of the players recorded
+    shoes : list of tuple
+        For each shoe, the file offset of its shoe record and its number of
+        rounds
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('Not a replay log: ', path)
+            self.shoes = []
+            while True:
+                offset = f.tell()
+                record = f.read(RECORD.size)
+                if len(record) < RECORD.size:
+                    break
+                recordType, length = RECORD.unpack(record)
+                if recordType == b'H':
+                    header = json.loads(f.read(length))
+                    continue
+                if recordType == b'S':
+                    self.shoes.append([offset, 0])
+                elif recordType == b'R':
+                    self.shoes[-1][1] += 1
+                f.seek(length, 1)
+        self.numberOfSeats = header['numberOfSeats']
+        self.seats = header['seats']
+        self.players = header['players']
+
+    @property
+    def numberOfShoes(self):
+        return len(self.shoes)
+
+    def roundsInShoe(self, shoe):
+        return self.shoes[shoe][1]
+
+    def readShoe(self, shoe):
+        """
+        Read a shoe and its rounds.
+
+        Returns
+        -------
+        penPosition : int
+            Where the shoe was cut
+        startPosition : int
+            Number of cards dealt before recording of the shoe started,
+            non-zero only for the first shoe of a recording
+        cards : list of int
+            Cards of the shoe in dealing order
+        banks : tuple of float
+            Each player's bank at the start of the shoe
+        rounds : list of bytes
+            The payload of each round record
+        """
+        P = len(self.players)
+        offset, numberOfRounds = self.shoes[shoe]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            recordType, length = RECORD.unpack(f.read(RECORD.size))
+            payload = f.read(length)
+            penPosition, startPosition, numberOfCards = struct.unpack_from('<HHH', payload)
+            cards = list(payload[6:6 + numberOfCards])
+            banks = struct.unpack_from('<{}d'.format(P), payload, 6 + numberOfCards)
+            rounds = []
+            for r in range(numberOfRounds):
+                recordType, length = RECORD.unpack(f.read(RECORD.size))
+                rounds.append(f.read(length))
+        return penPosition, startPosition, cards, banks, rounds
+
+    @staticmethod
+    def scriptPlayers(players, payload):
+        """
+        Give each scripted player its answers from a round record.
+        """
+        position = 0
+        for player in players:
+            numberOfBets = payload[position]
+            bets = list(struct.unpack_from('<{}d'.format(numberOfBets), payload, position + 1))
+            position += 1 + 8 * numberOfBets
+            numberOfDecisions, = struct.unpack_from('<H', payload, position)
+            position += 2
+            player.script(bets, payload[position:position + numberOfDecisions])
+            position += numberOfDecisions
+
+    def replayRound(self, shoe, roundNumber):
+        """
+        Reconstruct a round, by replaying its shoe up to and including it.
+
+        Parameters
+        ----------
+        shoe : int
+            Index of the shoe, from 0
+        roundNumber : int
+            Index of the round within the shoe, from 0
+
+        Returns
+        -------
+        game : Game object
+            A game just after the round was played: the table shows the
+            round's hands (see Game.showHands), the broadcast has seen its
+            cards and the scripted players hold the banks after it.
+        """
+        # Game itself imports this module
+        from Game import Game
+
+        penPosition, startPosition, cards, banks, rounds = self.readShoe(shoe)
+        game = Game(numberOfSeats=self.numberOfSeats)
+        players = [ScriptedPlayer(name, bank) for name, bank in zip(self.players, banks)]
+        for seatNo, p in enumerate(self.seats):
+            if p is not None:
+                game.addPlayerToSeat(players[p], seatNo)
+        game.table.shoe.setCards(cards)
+        game.table.shoe.penetrate(penPosition)
+        # Recording may have started partway through the shoe. Deal the cards
+        # that came out before it, so the broadcast has seen them too
+        for n in range(startPosition):
+            game.table.shoe.nextCard()
+        for payload in rounds[:roundNumber + 1]:
+            self.scriptPlayers(players, payload)
+            game.table.nextRound()
+        return game
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fast round executor for table-driven players.
+
+Table.nextRound plays a round through the object model: hands, seats, the
+dealer and a method call on the player for every decision. For players
+whose playing decisions can be written as a PolicyTable, RoundKernel plays
+a whole round (bets, deal, player actions, dealer, settling up) in a single
+function that keeps every hand in local variables and looks decisions up.
+
+It follows Table.nextRound exactly: cards are dealt in the same order, the
+broadcast sees every card, bets are still asked of Player.getBet and banks
+are settled through Player.settleRound, so for the same shoe the players'
+banks are the same as with Table.nextRound.
+"""
+
+from Cards import CARD_VALUE, CARD_HARD_VALUE, CARD_IS_ACE
+from DeckAndShoe import Shoe
+from PolicyTable import PolicyTable, isTableDriven
+
+
+class RoundKernel(object):
+    """
+    Plays the rounds at a table with lookup tables instead of the object
+    model. Every player at the table must be table-driven (see
+    PolicyTable.py). Each player's decisions are tabulated the first time
+    they play a round.
+
+    While enabled, the seats' and dealer's Hand objects are not used, so
+    Game.showHands has nothing to show. For the same reason the kernel
+    cannot be combined with a RoundProfiler, RoundLogWriter or
+    ReplayRecorder: it must be enabled with no other round hook installed
+    on the table (see Table.installRound), and they refuse to be enabled
+    over it.
+
+    Parameters
+    ----------
+    table : Table object
+        The table to play. It must deal from a finite Shoe, the kernel reads
+        the shoe's cards directly.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.enabled = False
+        self.policies = {}
+
+    def enable(self):
+        """
+        Play the table's rounds with this kernel.
+        """
+        if self.enabled:
+            return
+        if not isinstance(self.table.shoe, Shoe):
+            raise ValueError('RoundKernel needs a finite Shoe, got: ', type(self.table.shoe))
+        # The kernel plays the whole round itself, so anything installed
+        # before it (a profiler or a log) would silently stop seeing rounds
+        if self.table.roundHooks:
+            raise ValueError('RoundKernel cannot be enabled over other round hooks: ', self.table.roundHooks)
+        for player in self.table.getPlayers():
+            self.checkPlayer(player)
+        self.enabled = True
+        self.table.cleanSeats()
+        self.table.installRound(self.nextRound)
+
+    def disable(self):
+        """
+        Go back to playing rounds with Table.nextRound.
+        """
+        if not self.enabled:
+            return
+        self.table.removeRound(self.nextRound)
+        self.enabled = False
+
+    @staticmethod
+    def checkPlayer(player):
+        """
+        Raise ValueError unless a player's decisions can be tabulated.
+        """
+        if not isTableDriven(player):
+            raise ValueError('RoundKernel can only play table-driven players (see '
+                             'PolicyTable.isTableDriven), got: ', player.__name__)
+
+    def policy(self, player):
+        """
+        The hit, double and split tables of a player.
+        """
+        if player not in self.policies:
+            # Players may have been seated since the kernel was enabled
+            self.checkPlayer(player)
+            table = PolicyTable(player)
+            self.policies[player] = (table.hit, table.double, table.split)
+        return self.policies[player]
+
+    def nextRound(self):
+        """
+        Play the next round, as Table.nextRound.
+        """
+        table = self.table
+        shoe = table.shoe
+        cards = shoe.cards
+        position = shoe.position
+        append = table.broadcast.append
+        VALUE = CARD_VALUE
+        HARD = CARD_HARD_VALUE
+        ACE = CARD_IS_ACE
+
+        # Bets
+        playing = []
+        for seat in table.seats:
+            player = seat.player
+            if player:
+                bet = player.getBet()
+                if bet <= player.bank and bet > 0:
+                    player.roundBetting += bet
+                    playing.append([player, bet, 0, 0])
+
+        # Deal, two cards each, dealer second and last
+        for entry in playing:
+            card = cards[position]
+            position += 1
+            append(card)
+            entry[2] = card
+        upCard = cards[position]
+        position += 1
+        append(upCard)
+        for entry in playing:
+            card = cards[position]
+            position += 1
+            append(card)
+            entry[3] = card
+        holeCard = cards[position]
+        position += 1
+        append(holeCard)
+        up = VALUE[upCard]
+        table.broadcast.dealersTotal = up
+        table.broadcast.holeCard = holeCard
+
+        # Player actions. Each hand played ends up as (player, total,
+        # blackjack, bet)
+        results = []
+        for player, bet, first, second in playing:
+            hit, double, split = self.policy(player)
+            bank = player.bank
+            if VALUE[first] == VALUE[second] and split[VALUE[first]][up] and bank >= 2 * bet:
+                # Split, then play each hand in turn, drawing its second card
+                player.roundBetting += bet
+                starts = (first, second)
+                doubled = False
+            else:
+                starts = (None,)
+                hard = HARD[first] + HARD[second]
+                aces = ACE[first] + ACE[second]
+                soft = 1 if aces and hard <= 11 else 0
+                doubled = double[soft][hard + 10 * soft][up] and bank >= 2 * bet
+            for start in starts:
+                if start is not None:
+                    card = cards[position]
+                    position += 1
+                    append(card)
+                    hard = HARD[start] + HARD[card]
+                    aces = ACE[start] + ACE[card]
+                numberOfCards = 2
+                handBet = bet
+                if doubled:
+                    player.roundBetting += bet
+                    handBet = 2 * bet
+                    card = cards[position]
+                    position += 1
+                    append(card)
+                    hard += HARD[card]
+                    aces += ACE[card]
+                    numberOfCards = 3
+                soft = 1 if aces and hard <= 11 else 0
+                total = hard + 10 * soft
+                if not doubled:
+                    while total <= 20 and hit[soft][total][up]:
+                        card = cards[position]
+                        position += 1
+                        append(card)
+                        hard += HARD[card]
+                        aces += ACE[card]
+                        numberOfCards += 1
+                        soft = 1 if aces and hard <= 11 else 0
+                        total = hard + 10 * soft
+                results.append((player, total, total == 21 and numberOfCards == 2, handBet))
+
+        # Dealer
+        table.broadcast.holeCard = None
+        hard = HARD[upCard] + HARD[holeCard]
+        aces = ACE[upCard] + ACE[holeCard]
+        hitsSoft17 = table.dealer.hitsSoft17
+        while True:
+            soft = aces and hard <= 11
+            dealerTotal = hard + 10 if soft else hard
+            if dealerTotal <= 16 or (dealerTotal == 17 and soft and hitsSoft17):
+                card = cards[position]
+                position += 1
+                append(card)
+                hard += HARD[card]
+                aces += ACE[card]
+            else:
+                break
+        dealerBust = dealerTotal > 21
+        shoe.position = position
+
+        # Settle up
+        for player, total, blackjack, bet in results:
+            if total <= 21:
+                if blackjack:
+                    player.payout += bet*2.5
+                elif dealerBust:
+                    player.payout += bet*2
+                elif total > dealerTotal:
+                    player.payout += bet*2
+                elif total == dealerTotal:
+                    player.payout += bet
+        for player in table.getPlayers():
+            player.settleRound()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar on-disk log of every round played.
+
+A RoundLogWriter records one row per round: the shoe and round index, the
+true Hi-Lo count when bets were placed, the dealer's final total and, for
+every player, their bet, payout and bank after the round. Each column is a
+raw binary file of fixed width values, appended a chunk of rounds at a
+time, and a small JSON file describes the columns. RoundLog memory-maps the
+columns back as NumPy arrays, so a log far larger than memory can be
+analysed without re-simulating it.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from RoundKernel import RoundKernel
+
+# Metadata file in a log directory
+META_FILE = 'meta.json'
+
+# Columns with one value per round: name, dtype
+ROUND_COLUMNS = (('shoe', 'int64'), ('round', 'int64'), ('trueCount', 'float64'),
+                 ('dealerTotal', 'int8'))
+
+# Columns with one value per player per round: name, dtype
+PLAYER_COLUMNS = (('bet', 'float64'), ('payout', 'float64'), ('bank', 'float64'))
+
+
+def columnPath(path, name):
+    return os.path.join(path, name + '.bin')
+
+
+class RoundLogWriter(object):
+    """
+    Streams a table's rounds to a log directory. Enabling the writer wraps
+    the table's nextRound (whichever is in use), disabling it puts it back
+    and writes out everything buffered.
+
+    Bets and the dealer's total are read from the seats' and dealer's hands
+    after the round, which a RoundKernel does not fill, so enabling the
+    writer on a table played by a RoundKernel raises ValueError.
+
+    Parameters
+    ----------
+    table : Table object
+        The table to log. Seat players before enabling: the columns are
+        fixed when the writer is made, and players seated later are not
+        logged.
+    path : str
+        Directory to write the log to, created if needed. Any log already
+        there is replaced.
+    chunkRounds : int
+        Number of rounds buffered in memory between writes
+    """
+
+    def __init__(self, table, path, chunkRounds=65536):
+        self.table = table
+        self.path = path
+        self.chunkRounds = chunkRounds
+        self.enabled = False
+        self.players = table.getPlayers()
+        self.playerIndex = {player: p for p, player in enumerate(self.players)}
+        self.numberOfRounds = 0
+        self.shoe = -1
+        self.shoePosition = None
+
+        P = len(self.players)
+        self.buffers = {}
+        for name, dtype in ROUND_COLUMNS:
+            self.buffers[name] = np.zeros(chunkRounds, dtype=dtype)
+        for name, dtype in PLAYER_COLUMNS:
+            self.buffers[name] = np.zeros((chunkRounds, P), dtype=dtype)
+        self.buffered = 0
+
+        os.makedirs(path, exist_ok=True)
+        self.files = {name: open(columnPath(path, name), 'wb') for name in self.buffers}
+        self.writeMeta()
+
+    def enable(self):
+        """
+        Start logging rounds.
+        """
+        if self.enabled:
+            return
+        if any(isinstance(getattr(hook, '__self__', None), RoundKernel)
+               for hook in self.table.roundHooks):
+            raise ValueError('RoundLogWriter cannot be used with a RoundKernel')
+        self.enabled = True
+        self.playRound = self.table.installRound(self.nextRound)
+
+    def disable(self):
+        """
+        Stop logging rounds and write out the buffer.
+        """
+        if not self.enabled:
+            return
+        self.table.removeRound(self.nextRound)
+        self.enabled = False
+        self.flush()
+
+    def nextRound(self):
+        """
+        Play the next round and log it.
+        """
+        table = self.table
+        shoe = table.shoe
+        if self.shoePosition is None or shoe.position < self.shoePosition:
+            self.shoe += 1
+        trueCount = table.broadcast.trueCount('HiLo')
+        banks = [player.bank for player in self.players]
+
+        self.playRound()
+        self.shoePosition = shoe.position
+
+        row = self.buffered
+        buffers = self.buffers
+        buffers['shoe'][row] = self.shoe
+        buffers['round'][row] = self.numberOfRounds
+        buffers['trueCount'][row] = trueCount
+        buffers['dealerTotal'][row] = table.dealer.hand.total
+        bets = buffers['bet'][row]
+        bets[:] = 0
+        playerIndex = self.playerIndex
+        for seat in table.seats:
+            # Players seated after the log was made have no columns
+            p = playerIndex.get(seat.player)
+            if p is not None:
+                for hand in seat.hands:
+                    bets[p] += hand.bet
+        for p, player in enumerate(self.players):
+            buffers['bank'][row, p] = player.bank
+            buffers['payout'][row, p] = player.bank - banks[p] + bets[p]
+
+        self.numberOfRounds += 1
+        self.buffered += 1
+        if self.buffered == self.chunkRounds:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rounds to disk.
+        """
+        for name, buffer in self.buffers.items():
+            buffer[:self.buffered].tofile(self.files[name])
+            self.files[name].flush()
+        self.buffered = 0
+        self.writeMeta()
+
+    def writeMeta(self):
+        meta = {'numberOfRounds': self.numberOfRounds,
+                'players': [player.__name__ for player in self.players],
+                'columns': {name: {'dtype': str(buffer.dtype), 'shape': list(buffer.shape[1:])}
+                            for name, buffer in self.buffers.items()}}
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+    def close(self):
+        """
+        Stop logging, write everything out and close the files.
+        """
+        self.disable()
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+
+class RoundLog(object):
+    """
+    Read a round log, with every column memory-mapped.
+
+    Parameters
+    ----------
+    path : str
+        Log directory written by a RoundLogWriter
+
+    Attributes
+    ----------
+    players : list of str
+        Name of each player, in the order of the player columns
+    numberOfRounds : int
+        Number of rounds in the log
+    columns : dict
+        Every column as a read-only array: shoe, round, trueCount and
+        dealerTotal have shape (rounds,); bet, payout and bank have shape
+        (rounds, players)
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.players = meta['players']
+        self.numberOfRounds = meta['numberOfRounds']
+        self.columns = {}
+        for name, column in meta['columns'].items():
+            shape = (self.numberOfRounds,) + tuple(column['shape'])
+            if self.numberOfRounds:
+                self.columns[name] = np.memmap(columnPath(path, name), dtype=column['dtype'],
+                                               mode='r', shape=shape)
+            else:
+                self.columns[name] = np.zeros(shape, dtype=column['dtype'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
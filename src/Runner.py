@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo runner.
+
+Plays many independent realisations of a game across a pool of processes.
+Each worker writes its players' bank histories straight into a NumPy array
+living in shared memory, so nothing but a round count is sent back to the
+parent.
+
+Strategies can also be compared with common random numbers: every
+configuration of players is played against the identical sequence of
+shoes, and the runner reports the paired differences between them.
+"""
+
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from Game import Game
+
+
+def maxHistoryLength(numberOfShoes, penPosition=250):
+    """
+    Upper bound on the length of a player's bank history. Every round deals
+    at least the dealer's two cards, and rounds are only started while no
+    more than penPosition cards have been dealt.
+
+    Parameters
+    ----------
+    numberOfShoes : int
+        Number of shoes played
+    penPosition : int
+        Position the shoes are penetrated
+
+    Returns
+    -------
+    length : int
+        Maximum number of entries in the history, including the starting bank
+    """
+    return numberOfShoes * (penPosition // 2 + 1) + 1
+
+
+def realisationSeeds(numberOfRealisations, seed=None):
+    """
+    Independent seeds for each realisation, derived from a master seed.
+
+    Parameters
+    ----------
+    numberOfRealisations : int
+        Number of seeds wanted
+    seed : int
+        Master seed
+
+    Returns
+    -------
+    seeds : list of int
+        One seed per realisation
+    """
+    return [int(s.generate_state(1)[0])
+            for s in np.random.SeedSequence(seed).spawn(numberOfRealisations)]
+
+
+def playGame(playerClasses, seats, startingBank, numberOfShoes, seed):
+    """
+    Seat fresh instances of the player classes and play a seeded game.
+
+    Returns
+    -------
+    players : list
+        The players, after play
+    """
+    players = [playerClass(startingBank) for playerClass in playerClasses]
+    game = Game(seed=seed)
+    for player, seatNo in zip(players, seats):
+        game.addPlayerToSeat(player, seatNo)
+    game.play(numberOfShoes=numberOfShoes)
+    return players
+
+
+def playRealisation(task):
+    """
+    Play one realisation in a worker process and write the bank histories
+    into the shared array.
+
+    Parameters
+    ----------
+    task : tuple
+        (shared memory name, array shape, realisation index, seed, player
+        classes, seats, starting bank, number of shoes)
+
+    Returns
+    -------
+    length : int
+        Number of entries in each player's history
+    """
+    (name, shape, realisation, seed, playerClasses, seats, startingBank,
+     numberOfShoes) = task
+
+    players = playGame(playerClasses, seats, startingBank, numberOfShoes, seed)
+
+    shm = SharedMemory(name=name)
+    try:
+        history = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        for i, player in enumerate(players):
+            length = len(player.bankHistory)
+            history[i, realisation, :length] = player.bankHistory
+        del history
+    finally:
+        shm.close()
+    return length
+
+
+def runRealisations(playerClasses, numberOfShoes, numberOfRealisations,
+                    seats=None, startingBank=80000, processes=None, seed=None):
+    """
+    Play a number of independent realisations of a game in parallel. Every
+    realisation seats a fresh instance of each player class and plays
+    numberOfShoes shoes.
+
+    Parameters
+    ----------
+    playerClasses : list
+        Player classes to seat, must be importable by the worker processes
+    numberOfShoes : int
+        Number of shoes to play in each realisation
+    numberOfRealisations : int
+        Number of realisations
+    seats : list of int
+        Seat of each player class, defaults to seats 1, 2, ...
+    startingBank : float
+        Starting bank of every player
+    processes : int
+        Number of worker processes, defaults to the number of CPUs
+    seed : int
+        Master seed. Each realisation gets its own independent seed derived
+        from it, so results do not depend on the number of processes.
+
+    Returns
+    -------
+    history : array of float
+        Shape (players, realisations, rounds). The bank history of each
+        player in each realisation, zero after the realisation's last round.
+    lengths : array of int
+        Number of entries in each realisation's history
+    """
+    if seats is None:
+        seats = list(range(1, len(playerClasses) + 1))
+
+    shape = (len(playerClasses), numberOfRealisations, maxHistoryLength(numberOfShoes))
+    seeds = realisationSeeds(numberOfRealisations, seed)
+
+    shm = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        history = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        history[:] = 0
+        tasks = [(shm.name, shape, realisation, seeds[realisation],
+                  playerClasses, seats, startingBank, numberOfShoes)
+                 for realisation in range(numberOfRealisations)]
+        with Pool(processes) as pool:
+            lengths = np.array(pool.map(playRealisation, tasks), dtype=int)
+        result = history[:, :, :lengths.max()].copy()
+        del history
+    finally:
+        shm.close()
+        shm.unlink()
+    return result, lengths
+
+
+def playConfiguration(task):
+    """
+    Play one configuration in one realisation, in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        (player classes, seats, starting bank, number of shoes, seed)
+
+    Returns
+    -------
+    winnings : float
+        Net winnings of all the configuration's players together
+    """
+    playerClasses, seats, startingBank, numberOfShoes, seed = task
+    players = playGame(playerClasses, seats, startingBank, numberOfShoes, seed)
+    return sum(player.bank - startingBank for player in players)
+
+
+class PairedComparison(object):
+    """
+    Result of comparing configurations with common random numbers.
+
+    Attributes
+    ----------
+    results : array of float
+        Shape (configurations, realisations). Net winnings of each
+        configuration in each realisation.
+    differences : array of float
+        Shape (configurations, realisations). Winnings of each configuration
+        minus those of the first configuration, in the same realisation.
+    meanDifference : array of float
+        Mean paired difference of each configuration from the first
+    standardError : array of float
+        Standard error of the mean paired difference
+    unpairedStandardError : array of float
+        The standard error the same comparison would have had if every
+        configuration had seen independent shoes
+    """
+
+    def __init__(self, results):
+        self.results = results
+        n = results.shape[1]
+        self.differences = results - results[0]
+        self.meanDifference = self.differences.mean(axis=1)
+        self.standardError = self.differences.std(axis=1, ddof=1) / np.sqrt(n)
+        variance = results.var(axis=1, ddof=1)
+        self.unpairedStandardError = np.sqrt((variance + variance[0]) / n)
+
+    def summary(self, names=None):
+        """
+        A printable table of the paired differences.
+
+        Parameters
+        ----------
+        names : list of str
+            Name of each configuration
+
+        Returns
+        -------
+        summary : str
+            One line per configuration
+        """
+        if names is None:
+            names = [str(c) for c in range(len(self.results))]
+        lines = []
+        for c, name in enumerate(names):
+            lines.append("{:20s}: mean = {:12.2f}, difference = {:12.2f} +/- {:.2f} "
+                         "(unpaired +/- {:.2f})".format(
+                             name, self.results[c].mean(), self.meanDifference[c],
+                             self.standardError[c], self.unpairedStandardError[c]))
+        return '\n'.join(lines)
+
+
+def compareConfigurations(configurations, numberOfShoes, numberOfRealisations,
+                          startingBank=80000, processes=None, seed=None):
+    """
+    Compare configurations of players using common random numbers. In each
+    realisation every configuration is played with the same seed, so it is
+    dealt exactly the same sequence of shoes, and the differences between
+    configurations are paired.
+
+    Parameters
+    ----------
+    configurations : list of list
+        Each configuration is a list of player classes, seated 1, 2, ...
+    numberOfShoes : int
+        Number of shoes to play in each realisation
+    numberOfRealisations : int
+        Number of realisations
+    startingBank : float
+        Starting bank of every player
+    processes : int
+        Number of worker processes, defaults to the number of CPUs
+    seed : int
+        Master seed
+
+    Returns
+    -------
+    comparison : PairedComparison
+        Winnings and paired differences, relative to the first configuration
+    """
+    seeds = realisationSeeds(numberOfRealisations, seed)
+    tasks = [(playerClasses, list(range(1, len(playerClasses) + 1)),
+              startingBank, numberOfShoes, realisationSeed)
+             for playerClasses in configurations for realisationSeed in seeds]
+    with Pool(processes) as pool:
+        winnings = pool.map(playConfiguration, tasks)
+    results = np.array(winnings, dtype=float).reshape(len(configurations), numberOfRealisations)
+    return PairedComparison(results)
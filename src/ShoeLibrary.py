@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Libraries of pre-shuffled shoes.
+
+A library is a .npy file holding a 2-D uint8 array, one shuffled shoe per
+row with the cards in dealing order. Shoes dealt from a library cost no
+shuffling, and different experiments (or machines) given the same library
+are dealt the same shoes. When a library runs out, shoes are shuffled by a
+background thread into a queue, so the next shoe is always ready.
+
+Generate a library from the command line with
+
+    python ShoeLibrary.py shoes.npy 1000000 --decks 6 --seed 1
+"""
+
+import argparse
+import queue
+import random
+import threading
+
+import numpy as np
+
+from DeckAndShoe import shoeTemplate
+
+
+def generateLibrary(path, numberOfShoes, numberOfDecks=6, seed=None, chunkSize=10000):
+    """
+    Shuffle shoes and write them to a library file.
+
+    Parameters
+    ----------
+    path : str
+        File to write, conventionally ending .npy
+    numberOfShoes : int
+        Number of shoes in the library
+    numberOfDecks : int
+        Number of decks in each shoe
+    seed : int
+        Seed for the shuffles
+    chunkSize : int
+        Number of shoes shuffled at once
+    """
+    template = np.array(shoeTemplate(numberOfDecks), dtype=np.uint8)
+    rng = np.random.default_rng(seed)
+    library = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                        shape=(numberOfShoes, template.size))
+    for start in range(0, numberOfShoes, chunkSize):
+        stop = min(start + chunkSize, numberOfShoes)
+        library[start:stop] = rng.permuted(np.tile(template, (stop - start, 1)), axis=1)
+    library.flush()
+    del library
+
+
+class ShoeLibrary(object):
+    """
+    Deals shoes from a library file, memory-mapped so only the shoes used
+    are read. Once the library is used up, shoes are shuffled by a background
+    thread, which starts when fewer than prefetch shoes are left.
+
+    Parameters
+    ----------
+    path : str
+        Library file, see generateLibrary
+    start : int
+        Index of the first shoe to deal. Giving each experiment its own range
+        of the library keeps their shoes independent.
+    stop : int
+        Index after the last shoe to deal, the end of the library if not
+        given
+    seed : int
+        Seed for the shoes shuffled after the library runs out
+    prefetch : int
+        Number of shuffled shoes kept ready in the queue
+    """
+
+    def __init__(self, path, start=0, stop=None, seed=None, prefetch=64):
+        self.path = path
+        self.library = np.load(path, mmap_mode='r')
+        self.numberOfDecks = self.library.shape[1] // 52
+        self.position = start
+        self.stop = self.library.shape[0] if stop is None else min(stop, self.library.shape[0])
+        self.seed = seed
+        self.prefetch = prefetch
+        self.queue = queue.Queue(maxsize=prefetch)
+        self.producer = None
+        self.stopping = threading.Event()
+        self.closed = False
+
+    def shoesLeft(self):
+        """
+        Number of shoes left in the library itself.
+        """
+        return max(self.stop - self.position, 0)
+
+    def nextShoe(self):
+        """
+        The next shoe.
+
+        Returns
+        -------
+        cards : list of int
+            Cards of the shoe in dealing order
+        """
+        if self.closed:
+            raise ValueError('Shoe library is closed: ', self.path)
+        if self.shoesLeft() <= self.prefetch and self.producer is None:
+            self.startProducer()
+        if self.position < self.stop:
+            cards = self.library[self.position].tolist()
+            self.position += 1
+            return cards
+        return self.queue.get()
+
+    def nextShoes(self, number):
+        """
+        Several shoes at once, so a library can be the shoeSource of a
+        BatchGame.
+
+        Parameters
+        ----------
+        number : int
+            How many shoes
+
+        Returns
+        -------
+        shoes : array of uint8
+            Shape (number, 52*numberOfDecks), cards in dealing order
+        """
+        if self.closed:
+            raise ValueError('Shoe library is closed: ', self.path)
+        fromLibrary = min(number, self.shoesLeft())
+        shoes = np.empty((number, self.library.shape[1]), dtype=np.uint8)
+        shoes[:fromLibrary] = self.library[self.position:self.position + fromLibrary]
+        self.position += fromLibrary
+        for i in range(fromLibrary, number):
+            shoes[i] = self.nextShoe()
+        if self.shoesLeft() <= self.prefetch and self.producer is None:
+            self.startProducer()
+        return shoes
+
+    def startProducer(self):
+        """
+        Start shuffling shoes in the background.
+        """
+        self.producer = threading.Thread(target=self.produce, daemon=True)
+        self.producer.start()
+
+    def produce(self):
+        """
+        Keep the queue topped up with shuffled shoes until closed.
+        """
+        rng = random.Random(self.seed)
+        template = shoeTemplate(self.numberOfDecks)
+        while not self.stopping.is_set():
+            cards = list(template)
+            rng.shuffle(cards)
+            while not self.stopping.is_set():
+                try:
+                    self.queue.put(cards, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def close(self):
+        """
+        Stop the background thread. No more shoes can be dealt after this.
+        """
+        self.closed = True
+        self.stopping.set()
+        if self.producer is not None:
+            self.producer.join()
+            self.producer = None
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Generate a library of shuffled shoes.')
+    parser.add_argument('path', help='file to write, e.g. shoes.npy')
+    parser.add_argument('numberOfShoes', type=int, help='number of shoes')
+    parser.add_argument('--decks', type=int, default=6, help='decks per shoe')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the shuffles')
+    args = parser.parse_args()
+
+    generateLibrary(args.path, args.numberOfShoes, args.decks, args.seed)
+    print("Wrote {} shoes of {} decks to {}".format(args.numberOfShoes, args.decks, args.path))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Running statistics.
+"""
+
+from math import sqrt
+
+import numpy as np
+
+
+class RunningStats(object):
+    """
+    Running mean and variance (Welford). Values can be added one at a time
+    or in whole batches.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+
+    def push(self, value):
+        """
+        Add a single value.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, count, mean, m2):
+        """
+        Add a batch, given by its count, mean and sum of squared deviations
+        from its mean.
+        """
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def add(self, values):
+        """
+        Add a batch of values.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            mean = values.mean()
+            self.merge(values.size, mean, ((values - mean)**2).sum())
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def standardError(self):
+        return sqrt(self.variance() / self.count) if self.count > 1 else float('inf')
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps over Counter's bet ramp.
+
+Every configuration of betting parameters (mult, threshold, unit and
+maxBet, see Players.Counter) is played in stages with BatchGame, spread
+across a pool of processes. After each stage the running statistics of every
+configuration still in the sweep are updated, and any configuration whose
+confidence interval for the expected return per round lies wholly below
+that of another is dropped, so later stages only play the promising part of
+the grid. In each stage every configuration is dealt shoes from the same
+seed, so the comparisons are made with common random numbers.
+"""
+
+from itertools import product
+from multiprocessing import Pool
+
+import numpy as np
+
+from BatchGame import BatchGame
+from Players import Counter
+from Runner import realisationSeeds
+from Statistics import RunningStats
+
+
+def bettingGrid(mults=(7,), thresholds=(2,), units=(80,), maxBets=(None,)):
+    """
+    Every combination of the given betting parameters.
+
+    Returns
+    -------
+    configurations : list of dict
+        Keyword arguments for Counter, one dict per configuration
+    """
+    return [{'mult': mult, 'threshold': threshold, 'unit': unit, 'maxBet': maxBet}
+            for mult, threshold, unit, maxBet in product(mults, thresholds, units, maxBets)]
+
+
+def playSweepStage(task):
+    """
+    Play one stage of one configuration, in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        (configuration, number of games, number of shoes, starting bank,
+        seed)
+
+    Returns
+    -------
+    gameReturns : array of float
+        Mean return per round of each game
+    roundStats : tuple
+        (count, mean, sum of squared deviations) of the return of every
+        round played
+    ruined : int
+        Number of games in which the bank fell below one unit
+    """
+    configuration, numberOfGames, numberOfShoes, startingBank, seed = task
+    player = Counter(startingBank, **configuration)
+    game = BatchGame(numberOfGames, seed=seed)
+    game.addPlayerToSeat(player, 0)
+    history = game.play(numberOfShoes)[0]
+
+    rounds = game.roundsPlayed
+    finalBank = history[np.arange(numberOfGames), rounds]
+    gameReturns = (finalBank - startingBank) / np.maximum(rounds, 1)
+
+    roundReturns = np.diff(history, axis=1)
+    roundReturns = roundReturns[~np.isnan(roundReturns)]
+    mean = roundReturns.mean() if roundReturns.size else 0.
+    roundStats = (roundReturns.size, mean, ((roundReturns - mean)**2).sum())
+
+    ruined = int((np.nanmin(history, axis=1) < player.unit).sum())
+    return gameReturns, roundStats, ruined
+
+
+class SweepResult(object):
+    """
+    Results of a sweep, one row per configuration, best first.
+
+    Attributes
+    ----------
+    rows : list of dict
+        For each configuration: 'configuration', 'ev' (mean return per
+        round), 'standardError' (of ev), 'variance' (of the return of a
+        round), 'riskOfRuin' (fraction of games in which the bank fell below
+        one unit), 'games' played and 'eliminated', the stage after which it
+        was dropped (None if it lasted the whole sweep).
+    """
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: row['ev'], reverse=True)
+
+    def summary(self):
+        """
+        A printable table of the results.
+
+        Returns
+        -------
+        summary : str
+            One line per configuration, best first
+        """
+        lines = ["{:>6s} {:>9s} {:>6s} {:>8s} {:>10s} {:>10s} {:>12s} {:>6s} {:>6s} {:>10s}".format(
+            'mult', 'threshold', 'unit', 'maxBet', 'EV', '+/-', 'variance', 'ruin', 'games',
+            'eliminated')]
+        for row in self.rows:
+            c = row['configuration']
+            lines.append("{:6g} {:9g} {:6g} {:>8s} {:10.3f} {:10.3f} {:12.1f} {:6.3f} {:6d} {:>10s}".format(
+                c['mult'], c['threshold'], c['unit'], str(c['maxBet']), row['ev'],
+                row['standardError'], row['variance'], row['riskOfRuin'], row['games'],
+                '-' if row['eliminated'] is None else str(row['eliminated'])))
+        return '\n'.join(lines)
+
+
+def sweep(configurations, numberOfShoes, gamesPerStage=200, numberOfStages=10,
+          minimumStages=2, z=3., startingBank=80000, processes=None, seed=None):
+    """
+    Sweep betting configurations, dropping clearly worse ones as it goes.
+
+    Parameters
+    ----------
+    configurations : list of dict
+        Keyword arguments for Counter, see bettingGrid
+    numberOfShoes : int
+        Number of shoes in each game
+    gamesPerStage : int
+        Number of games each configuration plays per stage
+    numberOfStages : int
+        Largest number of stages
+    minimumStages : int
+        Number of stages before any configuration can be dropped
+    z : float
+        Width of the confidence intervals, in standard errors
+    startingBank : float
+        Starting bank of every game
+    processes : int
+        Number of worker processes, defaults to the number of CPUs
+    seed : int
+        Master seed
+
+    Returns
+    -------
+    result : SweepResult
+        Ranked table of every configuration
+    """
+    gameStats = [RunningStats() for configuration in configurations]
+    roundStats = [RunningStats() for configuration in configurations]
+    ruined = [0] * len(configurations)
+    eliminated = [None] * len(configurations)
+    alive = list(range(len(configurations)))
+    seeds = realisationSeeds(numberOfStages, seed)
+
+    with Pool(processes) as pool:
+        for stage in range(numberOfStages):
+            tasks = [(configurations[c], gamesPerStage, numberOfShoes, startingBank, seeds[stage])
+                     for c in alive]
+            for c, (gameReturns, stats, ruinedGames) in zip(alive, pool.map(playSweepStage, tasks)):
+                gameStats[c].add(gameReturns)
+                roundStats[c].merge(*stats)
+                ruined[c] += ruinedGames
+
+            if stage + 1 < minimumStages:
+                continue
+            lower = {c: gameStats[c].mean - z * gameStats[c].standardError() for c in alive}
+            best = max(lower.values())
+            for c in list(alive):
+                if gameStats[c].mean + z * gameStats[c].standardError() < best:
+                    alive.remove(c)
+                    eliminated[c] = stage + 1
+            if len(alive) == 1:
+                break
+
+    rows = []
+    for c, configuration in enumerate(configurations):
+        rows.append({'configuration': configuration,
+                     'ev': gameStats[c].mean,
+                     'standardError': gameStats[c].standardError(),
+                     'variance': roundStats[c].variance(),
+                     'riskOfRuin': ruined[c] / gameStats[c].count,
+                     'games': gameStats[c].count,
+                     'eliminated': eliminated[c]})
+    return SweepResult(rows)
+
+
+if __name__ == '__main__':
+
+    configurations = bettingGrid(mults=(1, 3, 7), thresholds=(1, 2, 3),
+                                 maxBets=(None, 800))
+    result = sweep(configurations, numberOfShoes=20, gamesPerStage=100,
+                   numberOfStages=5, startingBank=8000, seed=1)
+    print(result.summary())
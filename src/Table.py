@@ -8,9 +8,13 @@ Created on Thu Sep 19 18:42:56 2019
 Table class
 """
 
-from DeckAndShoe import Shoe
+import random
+
+from DeckAndShoe import Shoe, InfiniteShoe
 from HandSeatAndDealer import Seat, Dealer
 import utilityFunctions as ut
+from Decisions import (HIT, DOUBLE, SPLIT, ALLOW_STAND, ALLOW_HIT, ALLOW_DOUBLE,
+                       ALLOW_SPLIT)
 
 class Table(object):
     """
@@ -26,16 +30,36 @@ class Table(object):
         Minimum bet size
     maxBet : int
         Maximum bet size
+    rng : random.Random
+        Random number generator used to shuffle every shoe at this table. A
+        fresh, unseeded one is used if not given.
+    shoeLibrary : ShoeLibrary object
+        Deal pre-shuffled shoes from this library instead of shuffling
+    roundsPerShoe : int
+        If given, deal from an InfiniteShoe, each shoe lasting this many
+        rounds, instead of a finite shoe. Cannot be combined with
+        shoeLibrary.
     """
 
     maxNumberOfSeats = 6
 
 
-    def __init__(self, broadcast, numberOfSeats=6, minBet=1, maxBet=100):
+    def __init__(self, broadcast, numberOfSeats=6, minBet=1, maxBet=100, rng=None,
+                 shoeLibrary=None, roundsPerShoe=None):
+        if shoeLibrary is not None and roundsPerShoe is not None:
+            raise ValueError('An infinite shoe (roundsPerShoe) cannot deal from a shoeLibrary')
         self.broadcast = broadcast
+        self.shoeLibrary = shoeLibrary
+        self.roundsPerShoe = roundsPerShoe
+        self.rng = rng if rng is not None else random.Random()
         self.dealer = Dealer()
         self.seats = []
+        # Hands not in play, reused by every seat
+        self.handPool = []
         self.numberOfSeats = numberOfSeats
+        # Replacements of nextRound installed on the table, latest last
+        self.roundHooks = []
+        self.shoe = None
         self.newShoe()
 
         for i in range(self.numberOfSeats):
@@ -45,10 +69,17 @@ class Table(object):
 
     def newShoe(self, penPosition=250):
         """
-        Generate a new shoe.
+        Generate a new shoe. After the first, the existing shoe is reshuffled
+        rather than built again.
         """
-        self.broadcast.reset()
-        self.shoe = Shoe(self.broadcast)
+        for player in self.getPlayers():
+            player.recorder.newShoe()
+        if self.shoe is not None:
+            self.shoe.reshuffle()
+        elif self.roundsPerShoe is not None:
+            self.shoe = InfiniteShoe(self.broadcast, rng=self.rng, roundsPerShoe=self.roundsPerShoe)
+        else:
+            self.shoe = Shoe(self.broadcast, rng=self.rng, library=self.shoeLibrary)
         self.shoe.penetrate(penPosition)
 
 
@@ -56,7 +87,7 @@ class Table(object):
         """
         Add a new seat to the table.
         """
-        self.seats.append(Seat())
+        self.seats.append(Seat(self.handPool))
 
 
     def playerActions(self):
@@ -71,8 +102,7 @@ class Table(object):
                     hand.addCard(self.shoe.nextCard())
                 elif len(seat.hands) == 1 and ut.canSplit(hand) and seat.player.wantsToSplit(hand) and seat.player.bank >= 2*hand.bet:
                     seat.newBet(hand.bet)
-                    seat.hands[1].addCard(hand.cards[1])
-                    hand.cards.remove(hand.cards[1])
+                    seat.hands[1].addCard(hand.popCard())
                     hand.addCard(self.shoe.nextCard())
                 elif ut.canDoubleDown(hand) and seat.player.wantsToDoubleDown(hand) and seat.player.bank >= 2*hand.bet:
                     seat.player.roundBetting += hand.bet
@@ -85,6 +115,62 @@ class Table(object):
                         hand.stick()
 
 
+    def actionRequests(self):
+        """
+        Generator form of playerActions, for deciding hands elsewhere (see
+        BatchedPlay.py). For each decision it yields (seat, hand, allowed),
+        where allowed is a mask of the actions the hand may take (see
+        Decisions.py), and must be sent back the action chosen. Splitting
+        and doubling are only allowed when the player can afford them.
+        """
+        for seat in self.seats:
+            for hand in seat.hands:
+                if len(hand.cards) == 1:
+                    # Player must have split so take another card
+                    hand.addCard(self.shoe.nextCard())
+                else:
+                    # Start of hand, the player may also split or double
+                    allowed = ALLOW_STAND
+                    if hand.total <= 20:
+                        allowed |= ALLOW_HIT
+                    if seat.player.bank >= 2*hand.bet:
+                        allowed |= ALLOW_DOUBLE
+                        if len(seat.hands) == 1 and ut.canSplit(hand):
+                            allowed |= ALLOW_SPLIT
+                    action = yield seat, hand, allowed
+                    if action == SPLIT:
+                        seat.newBet(hand.bet)
+                        seat.hands[1].addCard(hand.popCard())
+                        hand.addCard(self.shoe.nextCard())
+                    elif action == DOUBLE:
+                        seat.player.roundBetting += hand.bet
+                        hand.doubleDown(self.shoe)
+                    elif action == HIT:
+                        hand.hit(self.shoe)
+                    else:
+                        hand.stick()
+                # Play normally
+                while ut.canBePlayed(hand):
+                    action = yield seat, hand, ALLOW_STAND | ALLOW_HIT
+                    if action == HIT:
+                        hand.hit(self.shoe)
+                    else:
+                        hand.stick()
+
+
+    def roundRequests(self):
+        """
+        Generator form of nextRound, yielding every decision as
+        actionRequests does.
+        """
+        self.cleanSeats()
+        self.getBets()
+        self.deal()
+        yield from self.actionRequests()
+        self.dealerAction()
+        self.settleUp()
+
+
     def cleanSeats(self):
         """
         Delete all hands.
@@ -123,16 +209,21 @@ class Table(object):
                 for hand in seat.hands:
                     hand.addCard(self.shoe.nextCard())
         # Dealers second
-        self.dealer.hand.addCard(self.shoe.nextCard())
+        holeCard = self.shoe.nextCard()
+        self.dealer.hand.addCard(holeCard)
 
-        # Update the broadcast with dealers up card
+        # Update the broadcast with dealers up card, and note the hole card
+        # it has counted but the players have not seen
         self.broadcast.dealersTotal = self.dealer.total()
+        if self.shoe.broadcastsCards:
+            self.broadcast.holeCard = holeCard
 
 
     def dealerAction(self):
         """
         Dealer plays until theys stick or bust.
         """
+        self.broadcast.holeCard = None
         self.dealer.playHand(self.dealer.hand, self.shoe)
 
 
@@ -148,6 +239,39 @@ class Table(object):
         self.dealerAction()
         self.settleUp()
 
+    def installRound(self, nextRound):
+        """
+        Play rounds with nextRound instead, until it is removed. Hooks are
+        stacked: the one installed last is used, and must be removed first.
+
+        Parameters
+        ----------
+        nextRound : callable
+            Plays a round in place of nextRound
+
+        Returns
+        -------
+        previous : callable
+            The nextRound in use until now, for a hook that wraps it
+        """
+        previous = self.nextRound
+        self.roundHooks.append(nextRound)
+        self.nextRound = nextRound
+        return previous
+
+    def removeRound(self, nextRound):
+        """
+        Remove a hook installed with installRound, going back to the one
+        before it (or to Table.nextRound).
+        """
+        if not self.roundHooks or self.roundHooks[-1] != nextRound:
+            raise ValueError('Remove the round hooks installed after this one first: ', self.roundHooks)
+        self.roundHooks.pop()
+        if self.roundHooks:
+            self.nextRound = self.roundHooks[-1]
+        else:
+            del self.nextRound
+
     def getPlayers(self):
         """
         Get all the players current at the table.
@@ -168,25 +292,27 @@ class Table(object):
         """
         Casino pays out winning hands.
         """
+        dealerTotal = self.dealer.hand.total
+        dealerBust = self.dealer.hand.bust
         for seat in self.seats:
             for hand in seat.hands:
-                tot = ut.getTotal(hand)
+                tot = hand.total
                 # Only pay out if player isnt bust
                 if tot <= 21:
                     # Recall that bet has already been taken, so payouts must
                     # include this again. I.e. a push requires bank+=bet
 
                     # Payout 1.5x if player got blackjack
-                    if ut.isBlackjack(hand):
+                    if hand.blackjack:
                         seat.player.payout += hand.bet*2.5
                     # Pay out if dealer busts
-                    elif ut.isBust(self.dealer.hand):
+                    elif dealerBust:
                         seat.player.payout += hand.bet*2
                     # Pay out if higher score than dealer
-                    elif tot > self.dealer.fullTotal():
+                    elif tot > dealerTotal:
                         seat.player.payout += hand.bet*2
                     # Push, give bet back
-                    elif tot == self.dealer.fullTotal():
+                    elif tot == dealerTotal:
                         seat.player.payout += hand.bet
 
         for player in self.getPlayers():
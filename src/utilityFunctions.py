@@ -8,6 +8,8 @@ Created on Fri Sep 20 17:45:36 2019
 Useful functions for interacting with the game.
 """
 
+from Cards import CARD_SUIT, CARD_VALUE, SUITS
+
 def getSuit(card):
     """
     Get the suit of a card. 
@@ -18,14 +20,14 @@ def getSuit(card):
     
     Parameters 
     ----------
-    card : str
+    card : int
         The card we are looking at
     Returns 
     -------
     suit : str
         The suit of the card 
     """
-    return card[-1]
+    return SUITS[CARD_SUIT[card]]
 
 def getNumber(card):
     """
@@ -33,7 +35,7 @@ def getNumber(card):
     
     Parameters 
     ----------
-    card : str
+    card : int
         The card we are looking at
         
     Returns 
@@ -41,13 +43,7 @@ def getNumber(card):
     val : int
         The value of the card
     """
-    num = card[:-1]
-    if num == 'A':
-        return 11 
-    elif num == 'J' or num == 'Q' or num == 'K':
-        return 10
-    else:
-        return int(num)
+    return CARD_VALUE[card]
 
 def getTotal(hand):
     """
@@ -63,12 +59,7 @@ def getTotal(hand):
     tot : int
         The total value of the hand
     """
-    tot = 0
-    for card in hand.cards:
-        tot += getNumber(card)
-    if tot > 21 and isSoft(hand):
-        tot -= 10
-    return tot
+    return hand.total
 
 def isNotBust(hand):
     """
@@ -84,7 +75,7 @@ def isNotBust(hand):
     nb : bool
         not bust
     """
-    return getTotal(hand) <= 21
+    return not hand.bust
 
 def isBust(hand):
     """
@@ -100,7 +91,7 @@ def isBust(hand):
     b : bool
         bust
     """
-    return getTotal(hand) > 21
+    return hand.bust
 
 def canBePlayed(hand):
     """
@@ -119,7 +110,7 @@ def canBePlayed(hand):
     """
     if hand.stuck:
         return False
-    elif getTotal(hand) <= 20:
+    elif hand.total <= 20:
         return True
     # Either the player has 21 or bust, so auto-stick
     hand.stick()
@@ -127,7 +118,7 @@ def canBePlayed(hand):
 
 def isSoft(hand):
     """
-    Is this hand soft?
+    Is this hand soft, i.e. is an ace being counted as 11?
     
     Parameters 
     ----------
@@ -139,10 +130,7 @@ def isSoft(hand):
     soft : bool
         Is this hand soft?
     """
-    for card in hand.cards:
-        if getNumber(card) == 11:
-            return True
-    return False
+    return hand.soft
 
 def canSplit(hand):
     """
@@ -159,7 +147,7 @@ def canSplit(hand):
         Is this hand splittable?
     """
     if len(hand.cards) == 2 and \
-                    (getNumber(hand.cards[0]) == getNumber(hand.cards[1])):
+                    (CARD_VALUE[hand.cards[0]] == CARD_VALUE[hand.cards[1]]):
         return True
     return False
 
@@ -195,7 +183,7 @@ def isFlush(hand):
     soft : bool
         Is this hand a flush?
     """
-    if getSuit(hand.cards[0]) == getSuit(hand.cards[1]):
+    if CARD_SUIT[hand.cards[0]] == CARD_SUIT[hand.cards[1]]:
         return True
     return False
 
@@ -213,11 +201,7 @@ def isBlackjack(hand):
     soft : bool
         Is this hand blackjack?
     """
-    if len(hand.cards) > 2:
-        return False
-    elif getTotal(hand) == 21: 
-        return True
-    return False
+    return hand.blackjack
 
 def handHas(hand, val):
     """
@@ -235,8 +219,8 @@ def handHas(hand, val):
     has : bool
         Does this hand have val?
     """
-    if (getNumber(hand.cards[0]) == val or
-        getNumber(hand.cards[1]) == val):
+    if (CARD_VALUE[hand.cards[0]] == val or
+        CARD_VALUE[hand.cards[1]] == val):
         return True
     return False
     
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BatchGame must play exactly as Game.play does on the same shoes.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from Broadcast import Broadcast
+from DeckAndShoe import Shoe
+from Game import Game
+from BatchGame import BatchGame
+from Players import BasicStrategist, Counter, Sticker, Mug, Risker, Oracle
+
+PLAYER_CLASSES = (BasicStrategist, Counter, Sticker, Mug, Risker)
+
+
+def testBatchGameMatchesGame():
+    numberOfShoes = 5
+    for seed in range(5):
+        # Game shuffles its shoes with random.Random(seed), so the same
+        # generator gives BatchGame the same shoes
+        rng = random.Random(seed)
+        shoes = iter([list(Shoe(Broadcast(), rng=rng).cards) for n in range(numberOfShoes + 1)])
+
+        players = [cls(8000) for cls in PLAYER_CLASSES]
+        game = Game(seed=seed)
+        for seatNo, player in enumerate(players):
+            game.addPlayerToSeat(player, seatNo)
+        game.play(numberOfShoes=numberOfShoes)
+
+        batch = BatchGame(1, shoeSource=lambda n: np.array([next(shoes) for i in range(n)]))
+        for seatNo, cls in enumerate(PLAYER_CLASSES):
+            batch.addPlayerToSeat(cls(8000), seatNo)
+        history = batch.play(numberOfShoes)
+
+        for p, player in enumerate(players):
+            assert np.array_equal(np.asarray(player.bankHistory), history[p, 0]), (seed, player.__name__)
+
+
+def testBatchGameRefusesUnsupportedPlayers():
+    batch = BatchGame(2, seed=1)
+    player = BasicStrategist(8000)
+    batch.addPlayerToSeat(player, 0)
+    with pytest.raises(ValueError):
+        batch.addPlayerToSeat(player, 1)
+    with pytest.raises(ValueError):
+        batch.addPlayerToSeat(Counter(8000, system='Zen'), 1)
+    with pytest.raises(ValueError):
+        batch.addPlayerToSeat(Oracle(8000), 1)
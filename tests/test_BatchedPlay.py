@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+playBatched must play every game exactly as Game.play does.
+"""
+
+import pytest
+
+from Game import Game
+from Players import BasicStrategist, Counter, Mug, Risker
+from BatchedPlay import playBatched
+
+
+class CautiousStrategist(BasicStrategist):
+    """
+    Overrides a decision, so must not be played from basic strategy tables.
+    """
+
+    def wantsToHit(self, hand):
+        return hand.total < 12
+
+
+def makeGame(seed):
+    game = Game(seed=seed)
+    players = [BasicStrategist(80000), Counter(80000), Mug(5000), Risker(80000),
+               Counter(80000, mult=3), CautiousStrategist(80000)]
+    for seatNo, player in enumerate(players):
+        game.addPlayerToSeat(player, seatNo)
+    return game, players
+
+
+def testBatchedMatchesGame():
+    seeds = range(10)
+    expected = []
+    for seed in seeds:
+        game, players = makeGame(seed)
+        game.play(numberOfShoes=3)
+        expected.append([list(player.bankHistory) for player in players])
+
+    games = [makeGame(seed) for seed in seeds]
+    numberOfBatches = playBatched([game for game, players in games], numberOfShoes=3)
+    assert numberOfBatches > 0
+    assert expected == [[list(player.bankHistory) for player in players] for game, players in games]
+
+
+def testOverriddenDecisionsAreNotBatched():
+    assert BasicStrategist(1).batchedDecisions
+    assert Counter(1).batchedDecisions
+    assert not CautiousStrategist(1).batchedDecisions
+
+
+def testBatchedRefusesRoundHooks(tmp_path):
+    game, players = makeGame(1)
+    game.enableRoundLog(str(tmp_path / 'log'))
+    with pytest.raises(ValueError):
+        playBatched([game], numberOfShoes=1)
+    game.disableRoundLog()
+
+
+def testWrappedPlayersAreNotBatched():
+    player = BasicStrategist(1)
+    player.wantsToHit = lambda hand: False
+    assert not player.batchedDecisions
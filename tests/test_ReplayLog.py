@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A recorded game must replay to the same banks, round by round.
+"""
+
+import os
+
+from Game import Game
+from Players import BasicStrategist, Counter, Risker, Mug
+from ReplayLog import ReplayLog
+
+
+def testReplayRoundTrip(tmp_path):
+    path = str(tmp_path / 'replay.bin')
+    game = Game(seed=4)
+    players = [BasicStrategist(80000), Counter(80000), Risker(80000), Mug(20000)]
+    for seatNo, player in enumerate(players):
+        game.addPlayerToSeat(player, seatNo + 1)
+    # A player in two seats
+    game.addPlayerToSeat(players[0], 5)
+    game.play(numberOfShoes=2)
+    start = len(players[0].bankHistory) - 1
+
+    game.enableReplayLog(path)
+    game.play(numberOfShoes=4)
+    game.disableReplayLog()
+    assert 'nextRound' not in vars(game.table)
+    assert 'wantsToHit' not in vars(players[0])
+
+    log = ReplayLog(path)
+    assert log.numberOfShoes == 4
+    histories = [list(player.bankHistory) for player in players]
+    before = 0
+    for shoe in range(log.numberOfShoes):
+        for roundNumber in (0, log.roundsInShoe(shoe) - 1):
+            replayed = log.replayRound(shoe, roundNumber)
+            index = start + before + roundNumber + 1
+            assert [player.bank for player in replayed.table.getPlayers()] == \
+                [history[index] for history in histories]
+        before += log.roundsInShoe(shoe)
+
+
+def testReplayKeptWhenRoundLogEnabled(tmp_path):
+    path = str(tmp_path / 'replay.bin')
+    game = Game(seed=1)
+    player = BasicStrategist(80000)
+    game.addPlayerToSeat(player, 0)
+    game.enableReplayLog(path)
+    game.enableRoundLog(str(tmp_path / 'log'))
+    game.play(numberOfShoes=1)
+    game.disableRoundLog()
+    game.disableReplayLog()
+    assert os.path.getsize(path) > 0
+    assert 'getBet' not in vars(player)
+    assert ReplayLog(path).numberOfShoes == 1
+
+
+def testReplayRestoresPlayerWrappers(tmp_path):
+    game = Game(seed=1)
+    player = BasicStrategist(80000)
+    game.addPlayerToSeat(player, 0)
+    game.enableProfiling()
+    profiled = vars(player)['getBet']
+    game.enableReplayLog(str(tmp_path / 'replay.bin'))
+    game.play(numberOfShoes=1)
+    game.disableReplayLog()
+    assert vars(player)['getBet'] is profiled
+    game.disableProfiling()
+    assert 'getBet' not in vars(player)
+
+
+def testReplayStartedMidShoe(tmp_path):
+    path = str(tmp_path / 'replay.bin')
+    game = Game(seed=2)
+    players = [BasicStrategist(80000), Counter(80000)]
+    for seatNo, player in enumerate(players):
+        game.addPlayerToSeat(player, seatNo)
+    for n in range(5):
+        game.table.nextRound()
+    start = len(players[1].bankHistory) - 1
+
+    game.enableReplayLog(path)
+    game.play(numberOfShoes=2)
+    game.disableReplayLog()
+
+    log = ReplayLog(path)
+    histories = [list(player.bankHistory) for player in players]
+    for roundNumber in range(log.roundsInShoe(0)):
+        replayed = log.replayRound(0, roundNumber)
+        assert [player.bank for player in replayed.table.getPlayers()] == \
+            [history[start + roundNumber + 1] for history in histories]
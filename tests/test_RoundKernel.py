@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RoundKernel must play exactly as Table.nextRound does, and refuse to be
+combined with the hooks it would bypass.
+"""
+
+import pytest
+
+from Game import Game
+from Players import BasicStrategist, Counter, Mug, Risker, Sticker, Oracle
+
+
+def playGame(seed, kernel):
+    game = Game(seed=seed, broadcastHistory='full')
+    players = [BasicStrategist(80000), Counter(80000), Mug(3000), Risker(80000),
+               Sticker(80000), Counter(80000, system='Zen')]
+    for seatNo, player in enumerate(players):
+        game.addPlayerToSeat(player, seatNo)
+    if kernel:
+        game.enableRoundKernel()
+    game.play(numberOfShoes=5)
+    return [list(player.bankHistory) for player in players], list(game.broadcast.shoeHistory)
+
+
+def testKernelMatchesNextRound():
+    for seed in range(5):
+        assert playGame(seed, False) == playGame(seed, True), seed
+
+
+def testKernelRefusesOtherHooks(tmp_path):
+    game = Game(seed=1)
+    game.addPlayerToSeat(BasicStrategist(80000), 0)
+    game.enableRoundLog(str(tmp_path / 'log'))
+    with pytest.raises(ValueError):
+        game.enableRoundKernel()
+    game.disableRoundLog()
+
+    game.enableRoundKernel()
+    with pytest.raises(ValueError):
+        game.enableRoundLog(str(tmp_path / 'log'))
+    with pytest.raises(ValueError):
+        game.enableReplayLog(str(tmp_path / 'replay.bin'))
+    with pytest.raises(ValueError):
+        game.enableProfiling()
+    game.disableRoundKernel()
+    assert game.table.roundHooks == []
+    assert 'nextRound' not in vars(game.table)
+
+
+def testKernelNeedsFiniteShoe():
+    game = Game(seed=1, roundsPerShoe=10)
+    game.addPlayerToSeat(BasicStrategist(80000), 0)
+    with pytest.raises(ValueError):
+        game.enableRoundKernel()
+
+
+class CountingHitter(BasicStrategist):
+    """
+    Decides by the count, so cannot be tabulated.
+    """
+
+    def wantsToHit(self, hand):
+        return self.broadcast.trueCount('HiLo') < 0 or super().wantsToHit(hand)
+
+
+def testKernelRefusesPlayersThatAreNotTableDriven():
+    for player in (Oracle(80000), CountingHitter(80000)):
+        game = Game(seed=1)
+        game.addPlayerToSeat(player, 0)
+        with pytest.raises(ValueError):
+            game.enableRoundKernel()
+
+    # Or seated once the kernel is enabled
+    game = Game(seed=1)
+    game.addPlayerToSeat(BasicStrategist(80000), 0)
+    game.enableRoundKernel()
+    game.addPlayerToSeat(CountingHitter(80000), 1)
+    with pytest.raises(ValueError):
+        game.play(numberOfShoes=1)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The round log must agree with the players' banks.
+"""
+
+import numpy as np
+
+from Game import Game
+from Players import BasicStrategist, Counter
+from RoundLog import RoundLog
+
+
+def testRoundLogMatchesBanks(tmp_path):
+    path = str(tmp_path / 'log')
+    game = Game(seed=3)
+    players = [BasicStrategist(80000), Counter(80000)]
+    for seatNo, player in enumerate(players):
+        game.addPlayerToSeat(player, seatNo)
+    game.enableRoundLog(path)
+    game.play(numberOfShoes=2)
+    # Players seated after the log was made are not logged
+    game.addPlayerToSeat(BasicStrategist(80000), 2)
+    game.play(numberOfShoes=1)
+    game.disableRoundLog()
+
+    log = RoundLog(path)
+    for p, player in enumerate(players):
+        assert np.array_equal(log['bank'][:, p], player.bankHistory[1:])